@@ -1,138 +1,144 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from suppliers_data import suppliers_data
-
-# Define the data for each category
-categories = {
-    "1️⃣ Supplier General Characteristics": [
-        {"Criteria": "Supplier criticality", "Options": ["Core business dependency", "Important service", "Support service", "Non-essential"]},
-        {"Criteria": "Supplier size", "Options": ["Very small / unstable", "Medium", "Large", "Multinational"]},
-        {"Criteria": "Years of activity", "Options": ["< 2 years", "2–5 years", "5–10 years", ">10 years"]},
-        {"Criteria": "Dependency level", "Options": ["Single supplier", "Few alternatives", "Multiple suppliers", "Easily replaceable"]}
-    ],
-    "2️⃣ Geographical Risk Criteria": [
-        {"Criteria": "Country risk", "Options": ["Sanctioned / unstable", "Politically sensitive", "Emerging economy", "Stable country"]},
-        {"Criteria": "Data hosting location", "Options": ["High-risk country", "Mixed locations", "Regulated region", "Local / EU"]},
-        {"Criteria": "Regulatory alignment", "Options": ["No clear regulation", "Partial compliance", "Local compliance", "GDPR / strong laws"]},
-        {"Criteria": "Cross-border data flow", "Options": ["Uncontrolled", "Limited control", "Contractual control", "Fully regulated"]}
-    ],
-    "3️⃣ Sector & Activity Criteria": [
-        {"Criteria": "Sector sensitivity", "Options": ["Finance / Health", "Telecom / Gov", "IT services", "Non-sensitive"]},
-        {"Criteria": "Service type", "Options": ["Core operations", "Business support", "Technical support", "Administrative"]},
-        {"Criteria": "System access", "Options": ["Full privileged access", "High access", "Limited access", "No access"]},
-        {"Criteria": "Process outsourcing", "Options": ["Full outsourcing", "Partial", "Limited", "None"]}
-    ],
-    "4️⃣ Information Security & Cyber Risk": [
-        {"Criteria": "Data sensitivity", "Options": ["Highly confidential", "Personal data", "Internal data", "Public data"]},
-        {"Criteria": "Security certification", "Options": ["None", "In progress", "Partial", "ISO 27001 / SOC2"]},
-        {"Criteria": "Incident history", "Options": ["Repeated incidents", "Major incident", "Minor incidents", "None"]},
-        {"Criteria": "Access management", "Options": ["No control", "Weak controls", "Standard controls", "Strong IAM"]}
-    ],
-    "5️⃣ Business Continuity & Operational Risk": [
-        {"Criteria": "BCP / DRP", "Options": ["Not existing", "Informal", "Documented", "Tested & audited"]},
-        {"Criteria": "RTO / RPO", "Options": ["Undefined", "Very high", "Moderate", "Optimized"]},
-        {"Criteria": "SLA availability", "Options": ["No SLA", "Weak SLA", "Standard SLA", "Strong SLA"]},
-        {"Criteria": "Subcontracting", "Options": ["Unknown", "Multiple", "Limited", "Controlled"]}
-    ],
-    "6️⃣ Financial & Legal Risk": [
-        {"Criteria": "Financial stability", "Options": ["Loss-making", "Weak cash flow", "Stable", "Strong growth"]},
-        {"Criteria": "Legal compliance", "Options": ["Non-compliant", "Partial", "Mostly compliant", "Fully compliant"]},
-        {"Criteria": "Insurance", "Options": ["None", "Limited", "Adequate", "Full coverage"]},
-        {"Criteria": "Litigation history", "Options": ["Frequent", "Occasional", "Rare", "None"]}
-    ],
-    "7️⃣ ESG & Ethical Criteria": [
-        {"Criteria": "Ethics policy", "Options": ["None", "Informal", "Documented", "Enforced"]},
-        {"Criteria": "Anti-corruption", "Options": ["No controls", "Weak controls", "Internal policy", "Audited program"]},
-        {"Criteria": "Environmental impact", "Options": ["Harmful", "Uncontrolled", "Managed", "Sustainable"]},
-        {"Criteria": "Social responsibility", "Options": ["Violations", "Weak HR practices", "Basic", "Certified / audited"]}
-    ]
-}
+import datetime
+import functools
+import re
 
-# Risk levels mapping: lower index is higher risk
-risk_levels = ["Critical", "High", "Medium", "Low"]
+import streamlit as st
+from assessment_state import AssessmentState
+from criteria import COUNTRY_RISK, criteria_by_category, risk_levels
+from presentation_data import category_overview, criteria_matrix
+from risk_chart import distribution_spec, render_distribution
+from scoring import default_model
+from supplier_cache import (catalogue_export, filter_suppliers, load_assessment_history, load_catalogue,
+                            load_enrichment_pipeline, load_scoring_model, load_supplier_store, load_watch_list,
+                            portfolio_summary, scoring_model_version, screen_supplier, similar_suppliers,
+                            source_version, suggest_suppliers, supplier_facets, watch_list_version)
+from supplier_store import encode_profile
+from telemetry import end_rerun, render_debug_panel, span
+
+# Supplier catalogue backend (in-memory by default, or the file/SQLite catalogue named by
+# TPRM_CATALOGUE), shared across sessions and reloaded only when its source changes
+catalogue = load_catalogue(source_version())
+
+# Scoring model for the overall risk level (scoring.DEFAULT_MODEL, or the JSON definition
+# named by TPRM_SCORING_MODEL), compiled once and shared by every page
+scoring_model = load_scoring_model(scoring_model_version())
+
+# Append-only record of every submitted assessment (None when TPRM_HISTORY=off)
+history = load_assessment_history()
+
+# Risk data providers that pre-fill criteria (None unless TPRM_ENRICHMENT names a configuration)
+enrichment = load_enrichment_pipeline()
+
+# Sanctions / watch list that supplier names are screened against (None unless TPRM_WATCH_LIST is set)
+list_version = watch_list_version()
+watch_list = load_watch_list(list_version)
+
+# Number of autocomplete suggestions shown for a custom supplier name
+SEARCH_SUGGESTIONS = 10
+# Number of suppliers listed under "Similar Risk Profiles"
+SIMILAR_SUPPLIERS = 5
+# Seconds a provider lookup may hold up a rerun; failures are not retried here but cached
+# briefly by the pipeline, so a provider that is down costs at most this once per minute
+ENRICHMENT_TIMEOUT = 2.0
+# Number of earlier assessments listed under "Assessment History"
+HISTORY_ENTRIES = 5
+
+
+def render_similar_suppliers(levels, exclude=None):
+    # Closest catalogue suppliers by L1 distance over the option indexes (see similarity.py)
+    similar = similar_suppliers(catalogue, catalogue.version, bytes(levels), SIMILAR_SUPPLIERS, exclude)
+    if not similar:
+        return
+    st.markdown("### Similar Risk Profiles")
+    for name, distance, info in similar:
+        where = ", ".join(info[field] for field in ("sector", "geography") if info.get(field))
+        steps = "identical profile" if distance == 0 else f"{distance} risk level step{'s' * (distance != 1)} apart"
+        st.markdown(f"- **{name}**" + (f" ({where})" if where else "") + f" - {steps}")
 
 def risk_assessment_page():
     st.title("TPRM Supplier Classification Dashboard")
 
-    # Get unique sectors and geographies
-    all_sectors = sorted(set(supplier["metadata"]["sector"] for supplier in suppliers_data.values() if "metadata" in supplier))
-    all_geographies = sorted(set(supplier["metadata"]["geography"] for supplier in suppliers_data.values() if "metadata" in supplier))
-
-    # Filters
-    col1, col2 = st.columns(2)
-    with col1:
-        selected_sector = st.selectbox("Filter by Sector", ["All"] + all_sectors, help="Filter suppliers by sector")
-    with col2:
-        selected_geography = st.selectbox("Filter by Geography", ["All"] + all_geographies, help="Filter suppliers by geography")
-
-    # Filter suppliers
-    filtered_suppliers = [name for name, data in suppliers_data.items()
-                         if (selected_sector == "All" or data.get("metadata", {}).get("sector") == selected_sector) and
-                            (selected_geography == "All" or data.get("metadata", {}).get("geography") == selected_geography)]
-
-    # Supplier selection with dropdown and custom input
-    supplier_selection_method = st.radio(
-        "Supplier Selection Method",
-        ["Select from dropdown", "Enter custom name"],
-        horizontal=True,
-        help="Choose how to select or enter the supplier name"
-    )
-
-    if supplier_selection_method == "Select from dropdown":
-        if filtered_suppliers:
-            supplier_name = st.selectbox(
-                "Select Supplier from Database",
-                filtered_suppliers,
-                help="Choose from filtered suppliers in the database"
-            )
-        else:
-            st.warning("No suppliers match the current filters. Try adjusting the filters or use 'Enter custom name'.")
-            supplier_name = ""
-    else:
-        # Enhanced search with autocomplete and case-insensitive matching
-        supplier_input = st.text_input(
-            "Search Supplier",
-            placeholder="Start typing supplier name...",
-            help="Type to search suppliers or enter custom name. Search is case-insensitive with autocomplete suggestions."
+    with span("filter"):
+        # Get unique sectors and geographies with their supplier counts (cached per dataset version)
+        facets = supplier_facets(catalogue, catalogue.version)
+        sector_counts = facets.get("sector", {})
+        geography_counts = facets.get("geography", {})
+
+        # Filters
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_sector = st.selectbox("Filter by Sector", ["All"] + list(sector_counts),
+                                           format_func=lambda v: v if v == "All" else f"{v} ({sector_counts[v]} suppliers)",
+                                           help="Filter suppliers by sector")
+        with col2:
+            selected_geography = st.selectbox("Filter by Geography", ["All"] + list(geography_counts),
+                                              format_func=lambda v: v if v == "All" else f"{v} ({geography_counts[v]} suppliers)",
+                                              help="Filter suppliers by geography")
+
+        # Filter suppliers through the catalogue's indexes (cached per dataset version and filter values)
+        filtered_suppliers = filter_suppliers(catalogue, catalogue.version,
+                                              sector=selected_sector, geography=selected_geography)
+
+    with span("search"):
+        # Supplier selection with dropdown and custom input
+        supplier_selection_method = st.radio(
+            "Supplier Selection Method",
+            ["Select from dropdown", "Enter custom name"],
+            horizontal=True,
+            help="Choose how to select or enter the supplier name"
         )
 
-        # Case-insensitive search and autocomplete
-        if supplier_input:
-            # Find matching suppliers (case-insensitive)
-            input_lower = supplier_input.lower()
-            matching_suppliers = [
-                name for name in suppliers_data.keys()
-                if input_lower in name.lower()
-            ]
-
-            # Exact match (case-insensitive)
-            exact_matches = [name for name in suppliers_data.keys() if name.lower() == input_lower]
-
-            if exact_matches:
-                # Use the exact match from database (preserve original casing)
-                supplier_name = exact_matches[0]
-            elif matching_suppliers:
-                # Show autocomplete suggestions
-                st.markdown("**Suggestions:**")
-                selected_suggestion = st.selectbox(
-                    "Select from suggestions or continue typing:",
-                    [""] + matching_suppliers,
-                    help="Choose a suggested supplier or keep typing for a custom name"
+        if supplier_selection_method == "Select from dropdown":
+            if filtered_suppliers:
+                supplier_name = st.selectbox(
+                    "Select Supplier from Database",
+                    filtered_suppliers,
+                    help="Choose from filtered suppliers in the database"
                 )
-                if selected_suggestion:
-                    supplier_name = selected_suggestion
+            else:
+                st.warning("No suppliers match the current filters. Try adjusting the filters or use 'Enter custom name'.")
+                supplier_name = ""
+        else:
+            # Enhanced search with autocomplete and case-insensitive matching
+            supplier_input = st.text_input(
+                "Search Supplier",
+                placeholder="Start typing supplier name...",
+                help="Type to search suppliers or enter custom name. Search is case-insensitive with autocomplete suggestions."
+            )
+
+            # Case-insensitive search and autocomplete through the catalogue's name index
+            if supplier_input:
+                # Exact match (case-insensitive)
+                exact_match = catalogue.exact(supplier_input)
+
+                # Ranked suggestions: substring matches first, then typo-tolerant matches
+                matching_suppliers = [] if exact_match else suggest_suppliers(
+                    catalogue, catalogue.version, supplier_input, SEARCH_SUGGESTIONS)
+
+                if exact_match:
+                    # Use the exact match from database (preserve original casing)
+                    supplier_name = exact_match
+                elif matching_suppliers:
+                    # Show autocomplete suggestions
+                    st.markdown("**Suggestions:**")
+                    selected_suggestion = st.selectbox(
+                        "Select from suggestions or continue typing:",
+                        [""] + matching_suppliers,
+                        help="Choose a suggested supplier or keep typing for a custom name"
+                    )
+                    if selected_suggestion:
+                        supplier_name = selected_suggestion
+                    else:
+                        supplier_name = supplier_input
                 else:
+                    # No matches found, use as custom name
                     supplier_name = supplier_input
             else:
-                # No matches found, use as custom name
-                supplier_name = supplier_input
-        else:
-            supplier_name = ""
+                supplier_name = ""
 
     # Show company info if supplier is found
-    if supplier_name and supplier_name in suppliers_data:
-        supplier_info = suppliers_data[supplier_name]["metadata"]
+    if supplier_name and supplier_name in catalogue:
+        supplier_info = catalogue.metadata(supplier_name)
 
         # Enhanced company information display
         st.success(f"**{supplier_name}** - Company Profile Found!")
@@ -179,75 +185,131 @@ def risk_assessment_page():
                 else:
                     st.caption("Growing organization")
 
+        # Load supplier profile if available
+        supplier_profile = catalogue.profile(supplier_name)
+        with span("similar"):
+            render_similar_suppliers(encode_profile(supplier_profile, supplier_name), exclude=supplier_name)
+
         # Risk assessment readiness
         st.markdown("### Risk Assessment Ready")
         st.info("Pre-filled risk profiles available for this supplier. You can adjust the assessments in the sidebar as needed.")
-
-        # Load supplier profile if available
-        supplier_profile = suppliers_data.get(supplier_name, {}).get("profile", {})
-    elif supplier_name and supplier_name not in suppliers_data:
+    elif supplier_name and supplier_name not in catalogue:
         st.info(f"**{supplier_name}** not found in database. Proceeding with manual risk assessment.")
         supplier_profile = {}
     else:
         supplier_profile = {}
 
-    # Advanced filters in sidebar
-    with st.sidebar.form("classification_form"):
-        st.header("Advanced Risk Selection")
-        selected_levels = {}
-        for cat_name, criteria_list in categories.items():
-            with st.expander(cat_name):
-                for crit in criteria_list:
-                    key = f"{cat_name}_{crit['Criteria']}"
-                    default_option = supplier_profile.get(key, crit['Options'][0])
-                    selected_levels[key] = st.selectbox(
-                        crit['Criteria'],
-                        options=crit['Options'],
-                        index=crit['Options'].index(default_option),
-                        key=key,
-                        help=f"Select the most appropriate risk level for {crit['Criteria']}"
-                    )
-
-        submitted = st.form_submit_button("Classify Supplier", type="primary")
+    # Pre-fill criteria from the configured providers (values are cached, see enrichment.py)
+    if enrichment is not None and supplier_name:
+        with span("enrichment"):
+            metadata = catalogue.metadata(supplier_name) if supplier_name in catalogue else {}
+            enriched = enrichment.run([(supplier_name, metadata)], timeout=ENRICHMENT_TIMEOUT,
+                                      retries=0)[supplier_name]
+        if enriched.criteria:
+            supplier_profile = {**supplier_profile, **enriched.criteria}
+            st.caption("Pre-filled from data providers: " + ", ".join(
+                f"{key.split('_', 1)[1]} ({enriched.sources[key]})" for key in enriched.criteria))
+        for provider, error in enriched.errors.items():
+            st.warning(f"Data provider {provider} unavailable: {error}")
+
+    # A watch-list hit suggests the Critical country risk option (see screening.py)
+    if watch_list is not None and supplier_name:
+        with span("screening"):
+            hits = screen_supplier(watch_list, list_version, supplier_name)
+        if hits:
+            from screening import SANCTIONED_OPTION
+            supplier_profile = {**supplier_profile, COUNTRY_RISK.key: SANCTIONED_OPTION}
+            st.error("Possible watch-list match: " + "; ".join(
+                f"{hit.name} [{hit.entry_id}]" + (f" as {hit.alias}" if hit.alias != hit.name else "") + f" ({hit.score:.0%})"
+                for hit in hits))
+
+    with span("sidebar_form"):
+        # A keyed selectbox keeps its own value across reruns and ignores a new `index`, so the
+        # pre-filled options (profile, provider values, watch-list suggestion) are written into
+        # the session state whenever they change, before the form is built
+        prefill = {crit.key: supplier_profile.get(crit.key, crit.options[0])
+                   for criteria in criteria_by_category.values() for crit in criteria}
+        if st.session_state.get("prefill") != prefill or any(key not in st.session_state for key in prefill):
+            st.session_state.update(prefill)
+            st.session_state["prefill"] = prefill
+
+        # Advanced filters in sidebar
+        with st.sidebar.form("classification_form"):
+            st.header("Advanced Risk Selection")
+            selected_levels = {}
+            for cat_name, criteria in criteria_by_category.items():
+                with st.expander(cat_name):
+                    for crit in criteria:
+                        selected_levels[crit.key] = st.selectbox(
+                            crit.name,
+                            options=crit.options,
+                            key=crit.key,
+                            help=f"Select the most appropriate risk level for {crit.name}"
+                        )
+
+            submitted = st.form_submit_button("Classify Supplier", type="primary")
 
     if submitted:
         # Main content
         st.header(f"Risk Classifications for {supplier_name or 'Unnamed Supplier'}")
 
+        # Per-session assessment state: only the criteria that changed since the last submit
+        # are re-scored, and the overall level and counts are kept as running totals
+        with span("scoring"):
+            assessment = st.session_state.setdefault("assessment", AssessmentState())
+            assessment.model = scoring_model
+            assessment.update(selected_levels)
+
+            # Overall risk under the scoring model (by default the simple average, truncated)
+            overall_risk = assessment.overall_level
+
         # Display selections
-        for cat_name, criteria_list in categories.items():
-            st.subheader(cat_name)
-            for crit in criteria_list:
-                key = f"{cat_name}_{crit['Criteria']}"
-                selected = selected_levels[key]
-                level_index = crit['Options'].index(selected)
-                level = risk_levels[level_index]
-                st.write(f"**{crit['Criteria']}**: {selected} ({level} Risk)")
-
-        # Optional: Compute overall risk (simple average)
-        total_criteria = sum(len(crit_list) for crit_list in categories.values())
-        total_risk_score = sum(c['Options'].index(selected_levels[f"{cat}_{c['Criteria']}"]) for cat, crit_list in categories.items() for c in crit_list)
-        average_risk_index = total_risk_score / total_criteria
-        overall_risk = risk_levels[int(average_risk_index)]
+        with span("results"):
+            for cat_name, criteria in criteria_by_category.items():
+                st.subheader(cat_name)
+                for crit in criteria:
+                    st.write(assessment.display_line(crit.id))
 
         st.header("Overall Risk Assessment")
         st.write(f"Based on the selections, the overall risk level is: **{overall_risk}**")
-
-        # Add a simple visualization
-        import matplotlib.pyplot as plt
-        risk_counts = {level: 0 for level in risk_levels}
-        for cat, crit_list in categories.items():
-            for c in crit_list:
-                selected = selected_levels[f"{cat}_{c['Criteria']}"]
-                idx = c['Options'].index(selected)
-                risk_counts[risk_levels[idx]] += 1
-
-        fig, ax = plt.subplots()
-        ax.bar(risk_counts.keys(), risk_counts.values(), color=['red', 'orange', 'yellow', 'green'])
-        ax.set_title('Risk Level Distribution')
-        ax.set_xlabel('Risk Level')
-        ax.set_ylabel('Number of Criteria')
-        st.pyplot(fig)
+        if scoring_model is not default_model:
+            st.caption(f"Scoring model: {scoring_model.name}")
+
+        # Add a simple visualization (rendered once per distinct distribution, then cached)
+        with span("chart"):
+            render_distribution(assessment.risk_counts())
+
+        # Record the assessment; earlier ones are listed first (the write is committed in the
+        # background, with other sessions' submits)
+        if history is not None and supplier_name:
+            with span("history"):
+                earlier = history.trend(supplier_name, limit=HISTORY_ENTRIES)
+                history.append(supplier_name, assessment.levels, assessment.overall_index,
+                               assessment.model_average_index, scoring_model.name)
+            if earlier:
+                st.markdown("### Assessment History")
+                for previous in reversed(earlier):
+                    when = datetime.datetime.fromtimestamp(previous.assessed_at).strftime("%Y-%m-%d %H:%M")
+                    st.markdown(f"- {when}: **{risk_levels[previous.overall_index]}** "
+                                f"(average {previous.average_index:.2f})")
+
+        # Catalogue suppliers closest to a supplier assessed by hand
+        if supplier_name not in catalogue:
+            with span("similar"):
+                render_similar_suppliers(assessment.levels)
+
+        # Export this result; files are generated when a button is clicked, on Streamlit's
+        # download thread, from a snapshot of the current selections
+        from export import EXPORT_FORMATS, export_assessment, export_formats
+        st.markdown("### Export Result")
+        file_stem = re.sub(r"[^\w.-]+", "_", supplier_name or "supplier") + "_risk"
+        formats = export_formats()
+        for column, fmt in zip(st.columns(len(formats)), formats):
+            mime, suffix = EXPORT_FORMATS[fmt]
+            column.download_button(f"Download {fmt.upper()}",
+                                   data=functools.partial(export_assessment, supplier_name, bytes(assessment.levels), fmt,
+                                                     scoring_model),
+                                   file_name=file_stem + suffix, mime=mime, on_click="ignore", key=f"export_{fmt}")
 
 def system_presentation_page():
     st.title("TPRM System Overview & Presentation")
@@ -255,61 +317,87 @@ def system_presentation_page():
     # Risk Criteria Overview - Detailed presentation
     st.markdown("## 🔍 Risk Assessment Framework - Detailed Analysis")
 
-    # Create comprehensive criteria table with risk levels
+    # Comprehensive criteria table with risk levels (built once per process, see presentation_data.py)
     st.markdown("### Complete Risk Criteria Matrix")
-
-    # Create detailed criteria DataFrame
-    detailed_criteria = []
-    for category_name, criteria_list in categories.items():
-        for criterion in criteria_list:
-            # Add risk level mapping for each option
-            risk_mapping = {}
-            for i, option in enumerate(criterion['Options']):
-                risk_mapping[option] = risk_levels[i]
-
-            detailed_criteria.append({
-                "Category": category_name.replace("️⃣", "").strip(),
-                "Criteria": criterion["Criteria"],
-                "Critical Risk": criterion["Options"][0],
-                "High Risk": criterion["Options"][1],
-                "Medium Risk": criterion["Options"][2],
-                "Low Risk": criterion["Options"][3]
-            })
-
-    criteria_df = pd.DataFrame(detailed_criteria)
-    st.dataframe(criteria_df, use_container_width=True)
-
-   
+    st.dataframe(criteria_matrix(), use_container_width=True)
 
     # Category breakdown
     st.markdown("### Categories Overview")
-    category_data = []
-    for cat_name, criteria_list in categories.items():
-        category_data.append({
-            "Category": cat_name.replace("️⃣", "").strip(),
-            "Criteria Count": len(criteria_list),
-            "Coverage": f"{len(criteria_list)} criteria"
-        })
-
-    cat_df = pd.DataFrame(category_data)
-    st.dataframe(cat_df, use_container_width=True)
+    st.dataframe(category_overview(), use_container_width=True)
 
     st.markdown("---")
 
-   
-
-   
-
-    
+def catalogue_export_file(store, fmt):
+    # Runs on Streamlit's download thread when the button is clicked, not in the script run;
+    # the file itself is written once per catalogue version (supplier_cache.catalogue_export).
+    # The open file is handed to Streamlit, which reads it and then drops the handle
+    return open(catalogue_export(store, store.version, fmt, scoring_model, scoring_model.version), "rb")
+
+def portfolio_dashboard_page():
+    # portfolio.py needs pandas; importing it here keeps pandas off the other pages
+    from portfolio import heatmap_spec
+
+    st.title("Portfolio Risk Dashboard")
+    if scoring_model is not default_model:
+        st.caption(f"Scoring model: {scoring_model.name}")
+
+    # Aggregates over the whole catalogue, computed once per dataset version from the score matrix
+    store = load_supplier_store(source_version())
+    summary = portfolio_summary(store, store.version, scoring_model, scoring_model.version)
+    if not summary["suppliers"]:
+        st.warning("The supplier catalogue is empty.")
+        return
+
+    # Headline figures
+    columns = st.columns(len(risk_levels) + 1)
+    columns[0].metric("Suppliers", f"{summary['suppliers']:,}")
+    for column, level in zip(columns[1:], risk_levels):
+        column.metric(f"{level} Risk", f"{summary['overall_distribution'][level]:,}")
+
+    # Distribution of overall risk levels
+    st.markdown("### Overall Risk Distribution")
+    st.vega_lite_chart(distribution_spec(summary["overall_distribution"].tolist(),
+                                         title="Overall Risk Level Distribution",
+                                         y_title="Number of Suppliers"),
+                       use_container_width=True)
+
+    # Per-category averages
+    st.markdown("### Average Risk Index by Category")
+    st.caption(f"0 = Critical, 3 = Low. Portfolio average: {summary['average_index']:.2f}")
+    st.dataframe(summary["category_average"].rename("Average risk index").to_frame(), use_container_width=True)
+
+    # Heatmaps per sector and per geography
+    for field, title in (("sector", "Sector"), ("geography", "Geography")):
+        heatmap = summary.get(f"by_{field}")
+        if heatmap is None or heatmap.empty:
+            continue
+        st.markdown(f"### Risk Heatmap by {title}")
+        st.vega_lite_chart(heatmap_spec(heatmap, title), use_container_width=True)
+
+    # Whole catalogue, scored and written in chunks (see export.py)
+    from export import EXPORT_FORMATS, export_formats
+    st.markdown("### Export Scored Catalogue")
+    st.caption("Overall level, risk counts and the level of every criterion for each supplier")
+    # Catalogues that do not fit in one Excel sheet are offered csv and parquet only
+    export_format = st.selectbox("Export format", export_formats(summary["suppliers"]), format_func=str.upper)
+    st.download_button(f"Download {summary['suppliers']:,} suppliers",
+                       data=functools.partial(catalogue_export_file, store, export_format),
+                       file_name="supplier_risk" + EXPORT_FORMATS[export_format][1],
+                       mime=EXPORT_FORMATS[export_format][0], on_click="ignore")
 
 # Main navigation
 pages = {
     "Risk Assessment": risk_assessment_page,
-    "System Presentation": system_presentation_page
+    "System Presentation": system_presentation_page,
+    "Portfolio Dashboard": portfolio_dashboard_page
 }
 
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Select Page", list(pages.keys()))
 
-# Run the selected page
-pages[page]()
\ No newline at end of file
+# Run the selected page (timed per page when TPRM_TELEMETRY is set, see telemetry.py)
+with span(f"rerun:{page}"):
+    pages[page]()
+
+render_debug_panel()
+end_rerun()
@@ -0,0 +1,383 @@
+# assessment_history.py
+# Append-only history of submitted assessments, stored in SQLite (WAL mode)
+#
+# Every "Classify Supplier" submit appends one row: supplier, timestamp, the 28 option
+# indexes (one byte each), the overall level index, the average index and the scoring model
+# name. Rows are never updated. Appends go through a background writer that commits them in
+# groups: one transaction, and so one fsync, per batch of up to HISTORY_BATCH_SIZE rows or
+# HISTORY_FLUSH_INTERVAL seconds, whichever comes first.
+#
+# Point-in-time queries are index seeks rather than scans:
+#   - latest per supplier: a `latest` table maintained by trigger on every append
+#   - as of a time: (supplier, assessed_at) index, one seek per supplier
+#   - trend: a range scan of the same index for one supplier, or of (assessed_at, overall)
+#     for level counts over the whole portfolio
+# Assessment ids only grow (AUTOINCREMENT), so they also serve as a watermark for jobs that
+# process new assessments (see drift.py).
+#
+# compact() removes repeated assessments (same levels, overall level and model as the
+# supplier's previous one, so every as-of answer keeps its content) and can thin out history
+# older than a cut-off to the last assessment per supplier and month. Assessments that drift
+# events (drift.py) refer to are kept. snapshot() writes a consistent copy of the database
+# with SQLite's online backup.
+#
+# Usage:
+#   python assessment_history.py latest history.sqlite [NAME]
+#   python assessment_history.py trend history.sqlite NAME
+#   python assessment_history.py compact history.sqlite [--monthly-before 2024-01-01]
+#   python assessment_history.py snapshot history.sqlite backup.sqlite
+
+import argparse
+import atexit
+import datetime
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from criteria import risk_levels
+from sqlite_catalogue import ConnectionPool
+
+# Rows per group commit, and the longest a submitted assessment waits for its commit
+HISTORY_BATCH_SIZE = 512
+HISTORY_FLUSH_INTERVAL = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    supplier_id INTEGER NOT NULL REFERENCES suppliers (id),
+    assessed_at REAL NOT NULL,
+    levels BLOB NOT NULL,
+    overall INTEGER NOT NULL,
+    average REAL NOT NULL,
+    model TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assessments_supplier_time ON assessments (supplier_id, assessed_at, id);
+CREATE INDEX IF NOT EXISTS assessments_time ON assessments (assessed_at, overall);
+CREATE TABLE IF NOT EXISTS latest (
+    supplier_id INTEGER PRIMARY KEY,
+    assessment_id INTEGER NOT NULL,
+    assessed_at REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS assessments_latest AFTER INSERT ON assessments BEGIN
+    INSERT INTO latest VALUES (NEW.supplier_id, NEW.id, NEW.assessed_at)
+    ON CONFLICT (supplier_id) DO UPDATE SET assessment_id = excluded.assessment_id, assessed_at = excluded.assessed_at
+    WHERE excluded.assessed_at >= latest.assessed_at;
+END;
+"""
+
+_COLUMNS = "a.id, s.name, a.assessed_at, a.levels, a.overall, a.average, a.model"
+
+Assessment = namedtuple("Assessment", ["id", "supplier", "assessed_at", "levels", "overall_index",
+                                       "average_index", "model"])
+
+# Periods for portfolio trends, as SQLite strftime formats
+TREND_PERIODS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+def _timestamp(when):
+    # Unix seconds from a datetime, a date (end of that day) or a number
+    if when is None:
+        return None
+    if isinstance(when, datetime.datetime):
+        return when.timestamp()
+    if isinstance(when, datetime.date):
+        return datetime.datetime.combine(when, datetime.time.max).timestamp()
+    return float(when)
+
+
+def _assessment(row):
+    return Assessment(row[0], row[1], row[2], bytes(row[3]), row[4], row[5], row[6])
+
+
+def _connect(path, timeout=30.0):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # FULL: every commit is fsync'd; group commits keep that to one fsync per batch
+    conn.execute("PRAGMA synchronous=FULL")
+    return conn
+
+
+class AssessmentHistory:
+    """Append-only assessment log with point-in-time queries, shared by every session."""
+
+    def __init__(self, path, batch_size=HISTORY_BATCH_SIZE, flush_interval=HISTORY_FLUSH_INTERVAL, pool_size=4):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._writer_conn = _connect(path)
+        self._writer_conn.executescript(_SCHEMA)
+        self._supplier_ids = {}
+        self.pool = ConnectionPool(path, size=pool_size)
+        self._queue = queue.Queue()
+        self._written = 0       # appends committed so far
+        self._queued = 0        # appends accepted so far
+        self._committed = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="assessment-history", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ---- writes ----
+
+    def append(self, supplier, levels, overall_index, average_index, model="", assessed_at=None):
+        """Queue one assessment; it is committed with the next group (see flush())."""
+        if self._closed:
+            raise ValueError("assessment history is closed")
+        assessed_at = time.time() if assessed_at is None else _timestamp(assessed_at)
+        record = (supplier, assessed_at, bytes(levels), int(overall_index), float(average_index), model)
+        with self._committed:
+            self._queued += 1
+        self._queue.put(record)
+
+    def flush(self, timeout=None):
+        """Block until every assessment appended so far is committed."""
+        with self._committed:
+            target = self._queued
+            return self._committed.wait_for(lambda: self._written >= target, timeout)
+
+    def _supplier_id(self, conn, name):
+        supplier_id = self._supplier_ids.get(name)
+        if supplier_id is None:
+            conn.execute("INSERT OR IGNORE INTO suppliers (name) VALUES (?)", (name,))
+            supplier_id = conn.execute("SELECT id FROM suppliers WHERE name = ?", (name,)).fetchone()[0]
+            self._supplier_ids[name] = supplier_id
+        return supplier_id
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            # Gather a group: up to batch_size records or until the flush interval has passed
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        conn = self._writer_conn
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO assessments (supplier_id, assessed_at, levels, overall, average, model) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(self._supplier_id(conn, name), *rest) for name, *rest in batch])
+        except Exception as exc:
+            # A failed group is dropped rather than retried forever; the app keeps running
+            self._supplier_ids.clear()
+            print(f"assessment history: could not write {len(batch)} assessments: {exc}", file=sys.stderr)
+        with self._committed:
+            self._written += len(batch)
+            self._committed.notify_all()
+
+    def close(self):
+        """Commit pending assessments and stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._writer_conn.close()
+        self.pool.close()
+
+    # ---- queries ----
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM assessments")[0][0]
+
+    @property
+    def last_id(self):
+        """Id of the most recent committed assessment (0 when empty)."""
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM assessments")[0][0]
+
+    def latest(self, supplier=None):
+        """The most recent Assessment of a supplier (None if never assessed), or of every supplier."""
+        sql = (f"SELECT {_COLUMNS} FROM latest l JOIN assessments a ON a.id = l.assessment_id "
+               "JOIN suppliers s ON s.id = l.supplier_id")
+        if supplier is not None:
+            rows = self._query(sql + " WHERE s.name = ?", (supplier,))
+            return _assessment(rows[0]) if rows else None
+        return [_assessment(row) for row in self._query(sql + " ORDER BY s.name")]
+
+    def as_of(self, when, supplier=None):
+        """The Assessment in force at `when` (datetime, date or Unix time) for one or every supplier."""
+        # One index seek per supplier on (supplier_id, assessed_at, id)
+        seek = ("SELECT id FROM assessments WHERE supplier_id = s.id AND assessed_at <= ? "
+                "ORDER BY assessed_at DESC, id DESC LIMIT 1")
+        sql = f"SELECT {_COLUMNS} FROM suppliers s JOIN assessments a ON a.id = ({seek})"
+        if supplier is not None:
+            rows = self._query(sql + " WHERE s.name = ?", (_timestamp(when), supplier))
+            return _assessment(rows[0]) if rows else None
+        return [_assessment(row) for row in self._query(sql + " ORDER BY s.name", (_timestamp(when),))]
+
+    def trend(self, supplier, start=None, end=None, limit=None):
+        """A supplier's assessments between `start` and `end`, oldest first (the newest `limit`)."""
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM assessments a JOIN suppliers s ON s.id = a.supplier_id "
+            "WHERE s.name = ? AND a.assessed_at >= ? AND a.assessed_at <= ? "
+            "ORDER BY a.assessed_at DESC, a.id DESC LIMIT ?",
+            (supplier, _timestamp(start) or 0.0, _timestamp(end) or float("inf"), -1 if limit is None else limit))
+        return [_assessment(row) for row in reversed(rows)]
+
+    def level_trend(self, start=None, end=None, period="month"):
+        """{period: {risk level: assessments}} over the portfolio, from the (assessed_at, overall) index."""
+        rows = self._query(
+            "SELECT strftime(?, assessed_at, 'unixepoch') AS bucket, overall, COUNT(*) FROM assessments "
+            "WHERE assessed_at >= ? AND assessed_at <= ? GROUP BY bucket, overall ORDER BY bucket",
+            (TREND_PERIODS[period], _timestamp(start) or 0.0, _timestamp(end) or float("inf")))
+        trend = {}
+        for bucket, overall, count in rows:
+            trend.setdefault(bucket, dict.fromkeys(risk_levels, 0))[risk_levels[overall]] = count
+        return trend
+
+    def since(self, watermark, limit=None):
+        """Committed assessments with an id above `watermark`, in id order."""
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM assessments a JOIN suppliers s ON s.id = a.supplier_id "
+            "WHERE a.id > ? ORDER BY a.id LIMIT ?", (watermark, -1 if limit is None else limit))
+        return [_assessment(row) for row in rows]
+
+    def previous(self, assessment):
+        """The supplier's Assessment before `assessment` (None for the first one)."""
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM assessments a JOIN suppliers s ON s.id = a.supplier_id "
+            "WHERE s.name = ? AND (a.assessed_at < ? OR (a.assessed_at = ? AND a.id < ?)) "
+            "ORDER BY a.assessed_at DESC, a.id DESC LIMIT 1",
+            (assessment.supplier, assessment.assessed_at, assessment.assessed_at, assessment.id))
+        return _assessment(rows[0]) if rows else None
+
+    # ---- maintenance ----
+
+    def compact(self, monthly_before=None):
+        """Delete repeated assessments (and thin history before a cut-off); returns rows deleted."""
+        self.flush()
+        # A connection of its own: the writer's belongs to the writer thread
+        conn = _connect(self.path)
+        try:
+            deleted = self._compact(conn, monthly_before)
+            # Give the freed pages back to the file system and reset the WAL
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        return deleted
+
+    def _compact(self, conn, monthly_before):
+        # Drift events (drift.py) name an assessment and its predecessor: keep both
+        keep = ""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'drift_events'").fetchone():
+            keep = (" AND id NOT IN (SELECT assessment_id FROM drift_events"
+                    " UNION SELECT previous_id FROM drift_events)")
+        with conn:
+            # An assessment equal to the supplier's previous one adds nothing to any as-of answer
+            deleted = conn.execute("""
+                DELETE FROM assessments WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, levels, overall, model,
+                               LAG(levels) OVER w AS prev_levels, LAG(overall) OVER w AS prev_overall,
+                               LAG(model) OVER w AS prev_model
+                        FROM assessments WINDOW w AS (PARTITION BY supplier_id ORDER BY assessed_at, id)
+                    )
+                    WHERE levels = prev_levels AND overall = prev_overall AND model = prev_model
+                ) AND id NOT IN (SELECT assessment_id FROM latest)
+            """ + keep).rowcount
+            if monthly_before is not None:
+                # Keep the last assessment of each supplier and calendar month
+                deleted += conn.execute("""
+                    DELETE FROM assessments WHERE assessed_at < ? AND id NOT IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY supplier_id, strftime('%Y-%m', assessed_at, 'unixepoch')
+                                ORDER BY assessed_at DESC, id DESC) AS rank
+                            FROM assessments WHERE assessed_at < ?
+                        ) WHERE rank = 1
+                    )
+                """ + keep, (_timestamp(monthly_before), _timestamp(monthly_before))).rowcount
+        return deleted
+
+    def snapshot(self, path):
+        """Write a consistent copy of the history to `path` (online backup, temp file + rename)."""
+        self.flush()
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            with self.pool.connection() as conn:
+                conn.backup(target)
+        finally:
+            target.close()
+        os.replace(tmp_path, path)
+        return path
+
+
+def _format(assessment):
+    when = datetime.datetime.fromtimestamp(assessment.assessed_at).isoformat(sep=" ", timespec="seconds")
+    return (f"{when}  {assessment.supplier}: {risk_levels[assessment.overall_index]} "
+            f"(average {assessment.average_index:.2f}, {assessment.model})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and maintain the assessment history")
+    commands = parser.add_subparsers(dest="command", required=True)
+    latest = commands.add_parser("latest", help="Latest assessment of one or every supplier")
+    latest.add_argument("path")
+    latest.add_argument("name", nargs="?")
+    trend = commands.add_parser("trend", help="Assessments of one supplier, oldest first")
+    trend.add_argument("path")
+    trend.add_argument("name")
+    compact = commands.add_parser("compact", help="Remove repeated assessments and reclaim space")
+    compact.add_argument("path")
+    compact.add_argument("--monthly-before", type=datetime.date.fromisoformat,
+                         help="Keep one assessment per supplier and month before this date (YYYY-MM-DD)")
+    snapshot = commands.add_parser("snapshot", help="Write a consistent copy of the history")
+    snapshot.add_argument("path")
+    snapshot.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path}: no such history file")
+    history = AssessmentHistory(args.path)
+    try:
+        if args.command == "latest":
+            found = history.latest(args.name) if args.name else history.latest()
+            for assessment in ([found] if args.name else found):
+                if assessment is not None:
+                    print(_format(assessment))
+        elif args.command == "trend":
+            for assessment in history.trend(args.name):
+                print(_format(assessment))
+        elif args.command == "compact":
+            print(f"Removed {history.compact(args.monthly_before)} assessments, {len(history)} kept")
+        else:
+            history.snapshot(args.target)
+            print(f"Wrote {len(history)} assessments to {args.target}")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# assessment_state.py
+# Per-session assessment state with incremental re-scoring
+#
+# Holds the option index of every criterion together with the running score sum and the
+# per-level counts. Changing one criterion applies an O(1) delta instead of re-scoring all 28,
+# and derived outputs are served from the state as long as nothing changed. The overall level
+# follows the state's scoring model (scoring.default_model: int() of the average option index).
+# Weighted or knockout models are evaluated over the 28 levels, once per revision.
+
+import numpy as np
+
+from criteria import criteria_table, risk_levels
+from scoring import default_model
+
+# Display line for every (criterion, option index), built once
+_DISPLAY_LINES = tuple(
+    tuple(f"**{crit.name}**: {option} ({risk_levels[i]} Risk)" for i, option in enumerate(crit.options))
+    for crit in criteria_table
+)
+
+
+class AssessmentState:
+    """Running score of one assessment, updated by deltas as criteria change."""
+
+    def __init__(self, model=default_model):
+        # Every criterion starts at index 0, the sidebar form default
+        self.levels = bytearray(len(criteria_table))
+        self.total = 0
+        self.counts = [0] * len(risk_levels)
+        self.counts[0] = len(criteria_table)
+        self.revision = 0
+        self.model = model
+        self._model_scores = None   # (revision, model, RiskScores)
+
+    def set(self, criterion_id, index):
+        """Set one criterion's option index; returns True if the assessment changed."""
+        old = self.levels[criterion_id]
+        if old == index:
+            return False
+        self.levels[criterion_id] = index
+        self.total += index - old
+        self.counts[old] -= 1
+        self.counts[index] += 1
+        self.revision += 1
+        return True
+
+    def update(self, selected_levels):
+        """Apply a {key: option} selection; returns the ids of the criteria that changed."""
+        changed = []
+        for crit in criteria_table:
+            option = selected_levels.get(crit.key)
+            if option is not None and self.set(crit.id, crit.option_index[option]):
+                changed.append(crit.id)
+        return changed
+
+    @property
+    def average_index(self):
+        return self.total / len(self.levels)
+
+    @property
+    def model_average_index(self):
+        """Average index as the scoring model computes it (weighted for weighted models)."""
+        if self.model.is_unweighted_mean:
+            return self.average_index
+        return float(self._scored().average_index[0])
+
+    def _scored(self):
+        if self._model_scores is None or self._model_scores[:2] != (self.revision, self.model):
+            levels = np.frombuffer(bytes(self.levels), dtype=np.uint8)
+            self._model_scores = (self.revision, self.model, self.model.score(levels))
+        return self._model_scores[2]
+
+    @property
+    def overall_index(self):
+        if self.model.is_unweighted_mean:
+            return int(self.average_index)
+        return int(self._scored().overall_index[0])
+
+    @property
+    def overall_level(self):
+        return risk_levels[self.overall_index]
+
+    def risk_counts(self):
+        return dict(zip(risk_levels, self.counts))
+
+    def display_line(self, criterion_id):
+        return _DISPLAY_LINES[criterion_id][self.levels[criterion_id]]
@@ -0,0 +1,137 @@
+# batch_scoring.py
+# Shard-based scoring of supplier assessment records, serially or on a process pool
+#
+# Records are read as raw CSV rows or JSONL lines and grouped into shards. Each shard is
+# parsed, encoded against the compiled criteria tables and scored with a compiled scoring
+# model (scoring.default_model unless given), exactly like risk_assessment_page scores one
+# supplier. The parallel mode keeps a bounded window of shards in flight and yields results
+# in input order, so output stays streamable and memory stays constant.
+
+import csv
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from criteria import criteria_table, criterion_ids, validate_profile
+from scoring import default_model
+from supplier_store import encode_profile
+
+FORMATS = ("csv", "jsonl")
+
+
+class ShardResult:
+    """Scores of one shard: parallel arrays for the accepted rows, plus rejected rows."""
+
+    def __init__(self, names, overall_index, average_index, counts, errors):
+        self.names = names
+        self.overall_index = overall_index
+        self.average_index = average_index
+        self.counts = counts
+        self.errors = errors    # [(line number, message)]
+
+
+def iter_records(stream, fmt):
+    """Return (header, records) where records yields (line number, raw CSV row or JSONL line)."""
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        header = next(reader, [])
+        return header, ((reader.line_num, values) for values in reader if values)
+    return None, ((line_no, line) for line_no, line in enumerate(stream, start=1) if line.strip())
+
+
+def check_header(header, name_field):
+    """Raise ValueError if a CSV header lacks the name field or has a column that is neither it nor a criterion key."""
+    if name_field not in header:
+        raise ValueError(f"no {name_field!r} column for the supplier name")
+    unknown = [column for column in header if column != name_field and column not in criterion_ids]
+    if unknown:
+        raise ValueError(f"unknown column(s) {', '.join(map(repr, unknown))}: expected {name_field!r} and "
+                         f"\"{{category}}_{{criterion}}\" criterion keys")
+
+
+def parse_record(fmt, raw, header, name_field):
+    """(supplier name, profile) from a raw record; the header is checked once by check_header."""
+    if fmt == "csv":
+        # zip() would silently drop extra cells or leave the last criteria unanswered
+        if len(raw) != len(header):
+            raise ValueError(f"{len(raw)} cells, the header has {len(header)}")
+        row = dict(zip(header, raw))
+        name = row.pop(name_field, None) or ""
+        # Blank cells count as unanswered, like a missing key in a profile
+        return name, {key: value for key, value in row.items() if value}
+    record = json.loads(raw)
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object")
+    name = record.get(name_field) or record.get("name") or ""
+    if "profile" in record:
+        profile = record["profile"]
+    else:
+        profile = {key: value for key, value in record.items() if key not in (name_field, "name")}
+    if not isinstance(profile, dict):
+        raise ValueError(f"Supplier {name!r}: profile is not a JSON object")
+    # Unknown keys would otherwise be ignored and their criteria scored as Critical
+    try:
+        validate_profile(profile, name)
+    except TypeError:
+        raise ValueError(f"Supplier {name!r}: options must be strings") from None
+    return name, profile
+
+
+def score_shard(shard, fmt, header, name_field, model=default_model):
+    """Parse, encode and score one shard of (line number, raw record) pairs."""
+    levels = np.zeros((len(shard), len(criteria_table)), dtype=np.uint8)
+    names = []
+    errors = []
+    for line_no, raw in shard:
+        try:
+            name, profile = parse_record(fmt, raw, header, name_field)
+            levels[len(names)] = encode_profile(profile, name)
+        except (ValueError, TypeError, AttributeError) as exc:
+            # One malformed record (e.g. a list where an option is expected) rejects its line only
+            errors.append((line_no, str(exc)))
+            continue
+        names.append(name)
+    scores = model.score(levels[:len(names)])
+    return ShardResult(names, scores.overall_index, scores.average_index, scores.counts, errors)
+
+
+def _shards(records, shard_size):
+    records = iter(records)
+    while True:
+        shard = list(islice(records, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def score_records(records, fmt, header, name_field, shard_size=1000, model=default_model):
+    """Score records shard by shard in this process."""
+    for shard in _shards(records, shard_size):
+        yield score_shard(shard, fmt, header, name_field, model)
+
+
+def _pool_context():
+    # Forked workers inherit the criteria tables already compiled in this process instead of
+    # re-importing and re-deriving them; other start methods fall back to a fresh import
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def score_records_parallel(records, fmt, header, name_field, shard_size=10000, workers=None, model=default_model):
+    """Score records on a process pool, yielding ShardResults in input order."""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        pending = deque()
+        for shard in _shards(records, shard_size):
+            pending.append(pool.submit(score_shard, shard, fmt, header, name_field, model))
+            # Bounded window: keep every worker busy without reading the whole input ahead
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,74 @@
+# drift_benchmark.py
+# Cost of an incremental drift run (drift.py) against the size of the history
+#
+# Fills a temporary assessment history with one assessment per synthetic supplier, runs the
+# drift job once over it, then appends rounds of re-assessments for a random subset of
+# suppliers and times the drift run after each round. Reports JSON.
+#
+# Usage: python benchmarks/drift_benchmark.py [--suppliers 300000] [--updates 5000] [--rounds 3]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_history import AssessmentHistory  # noqa: E402
+from drift import DriftDetector  # noqa: E402
+from scoring import default_model  # noqa: E402
+from synthetic import generate_store  # noqa: E402
+
+
+def append_all(history, names, levels):
+    scores = default_model.score(levels)
+    for name, row, overall, average in zip(names, levels, scores.overall_index.tolist(),
+                                           scores.average_index.tolist()):
+        history.append(name, row.tobytes(), overall, average, default_model.name)
+    history.flush()
+
+
+def timed_run(detector):
+    start = time.perf_counter()
+    processed, events = detector.run()
+    return {"processed": processed, "events": len(events), "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark incremental drift detection")
+    parser.add_argument("--suppliers", type=int, default=300_000)
+    parser.add_argument("--updates", type=int, default=5_000, help="Re-assessed suppliers per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    store = generate_store(args.suppliers, seed=3)
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.sqlite")
+        history = AssessmentHistory(path)
+        start = time.perf_counter()
+        append_all(history, store.names, store.levels)
+        report = {"suppliers": args.suppliers, "fill_seconds": round(time.perf_counter() - start, 3)}
+        detector = DriftDetector(path)
+        report["initial_run"] = timed_run(detector)
+        report["rounds"] = []
+        for _ in range(args.rounds):
+            rows = rng.choice(len(store), args.updates, replace=False)
+            # Re-assess with about one criterion in ten moved one level
+            levels = store.levels[rows].astype(np.int16)
+            levels += rng.choice([-1, 0, 0, 0, 0, 0, 0, 0, 0, 1], size=levels.shape)
+            levels = np.clip(levels, 0, 3).astype(np.uint8)
+            append_all(history, [store.names[row] for row in rows.tolist()], levels)
+            report["rounds"].append(timed_run(detector))
+        detector.close()
+        history.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# memory_benchmark.py
+# Compares the memory footprint of the nested suppliers_data dict with SupplierStore
+#
+# Usage: python benchmarks/memory_benchmark.py [--sizes 1000,100000]
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supplier_store import SupplierStore  # noqa: E402
+from synthetic import generate_suppliers  # noqa: E402
+
+
+def traced_size(build):
+    # Bytes still allocated (tracked by tracemalloc) after build() returns its result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def measure(count):
+    # Round-trip through JSON so keys and values are separate string objects, as they are
+    # when a large catalogue is loaded from an export rather than a source literal
+    payload = json.dumps(generate_suppliers(count))
+    records, dict_bytes = traced_size(lambda: json.loads(payload))
+    del payload
+    store, store_bytes = traced_size(lambda: SupplierStore.from_records(records))
+    return {
+        "suppliers": count,
+        "dict_bytes": dict_bytes,
+        "store_bytes": store_bytes,
+        "profile_bytes": store.profiles.nbytes + store.profile_ids.nbytes,
+        "distinct_profiles": len(store.profiles),
+        "ratio": round(dict_bytes / store_bytes, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare supplier catalogue memory footprints")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated supplier counts to measure")
+    args = parser.parse_args(argv)
+
+    results = [measure(int(size)) for size in args.sizes.split(",")]
+    for result in results:
+        print(f"{result['suppliers']:>9,} suppliers: dict {result['dict_bytes'] / 2**20:8.1f} MiB | "
+              f"store {result['store_bytes'] / 2**20:7.1f} MiB | {result['ratio']}x smaller")
+    return results
+
+
+if __name__ == "__main__":
+    main()
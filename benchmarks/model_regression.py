@@ -0,0 +1,90 @@
+# model_regression.py
+# Regression check: the default scoring model reproduces the original overall risk rule
+#
+# Scores random valid profiles with scoring.default_model (batch), with AssessmentState
+# (sidebar path) and with the original risk_assessment_page computation, and compares the
+# overall level, the average index and the per-level counts. Also scores the same profiles
+# with EXPLICIT_MODEL, a compiled model that takes the weighted path but is equivalent to the
+# default, so the weighted evaluator is covered too. Exits with status 1 on any mismatch;
+# tests/test_scoring_models.py runs the same check under pytest.
+#
+# Usage: python benchmarks/model_regression.py [--suppliers 20000]
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_state import AssessmentState  # noqa: E402
+from criteria import categories, risk_levels  # noqa: E402
+from scoring import ScoringModel, default_model, score_levels  # noqa: E402
+from synthetic import generate_store  # noqa: E402
+
+# Every category weighted 1, and a knockout that forces "Low", the least severe level, so it
+# never changes a result; the knockout alone keeps the model off the unweighted fast path
+EXPLICIT_MODEL = ScoringModel({
+    "name": "Explicit weights",
+    "aggregation": "mean",
+    "category_weights": {cat_name: 1 for cat_name in categories},
+    "knockouts": [{"criterion": "Country risk", "when": ["Critical"], "force": "Low"}],
+})
+
+
+def original_overall(selected_levels):
+    # The computation risk_assessment_page used before scoring models
+    total_criteria = sum(len(crit_list) for crit_list in categories.values())
+    total_risk_score = 0
+    risk_counts = {level: 0 for level in risk_levels}
+    for cat_name, crit_list in categories.items():
+        for crit in crit_list:
+            idx = crit['Options'].index(selected_levels[f"{cat_name}_{crit['Criteria']}"])
+            total_risk_score += idx
+            risk_counts[risk_levels[idx]] += 1
+    average_risk_index = total_risk_score / total_criteria
+    return average_risk_index, risk_levels[int(average_risk_index)], list(risk_counts.values())
+
+
+def mismatches(store):
+    """(supplier, path, expected, observed) for every scoring path that disagrees with the original rule."""
+    scores = default_model.score(store.levels)
+    weighted = EXPLICIT_MODEL.score(store.levels)
+    engine = score_levels(store.levels)
+    state = AssessmentState()
+
+    for row in range(len(store)):
+        profile = store.profile(row)
+        expected = original_overall(profile)
+        state.update(profile)
+        observed = {
+            "default_model": (scores.average_index[row], risk_levels[scores.overall_index[row]],
+                              scores.counts[row].tolist()),
+            "weighted_path": (weighted.average_index[row], risk_levels[weighted.overall_index[row]],
+                              weighted.counts[row].tolist()),
+            "score_levels": (engine.average_index[row], risk_levels[engine.overall_index[row]],
+                             engine.counts[row].tolist()),
+            "assessment_state": (state.average_index, state.overall_level, state.counts),
+        }
+        for path, result in observed.items():
+            if result != expected:
+                yield store.names[row], path, expected, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the default scoring model against the original rule")
+    parser.add_argument("--suppliers", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    store = generate_store(args.suppliers, seed=7)
+    failures = 0
+    for name, path, expected, result in mismatches(store):
+        failures += 1
+        if failures <= 10:
+            print(f"{name} ({path}): expected {expected}, got {result}", file=sys.stderr)
+
+    print(f"{len(store)} suppliers checked, {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# parallel_benchmark.py
+# Throughput of batch_scoring on one process vs a process pool, on a synthetic JSONL intake
+#
+# Usage: python benchmarks/parallel_benchmark.py [--rows 200000] [--workers 1,2,4,8]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scoring import iter_records, score_records, score_records_parallel  # noqa: E402
+from synthetic import generate_suppliers  # noqa: E402
+
+
+def write_intake(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for name, record in generate_suppliers(rows).items():
+            f.write(json.dumps({"supplier": name, **record["profile"]}, ensure_ascii=False) + "\n")
+
+
+def timed_pass(path, workers, shard_size):
+    start = time.perf_counter()
+    scored = 0
+    with open(path, encoding="utf-8") as f:
+        header, records = iter_records(f, "jsonl")
+        if workers == 1:
+            results = score_records(records, "jsonl", header, "supplier", shard_size)
+        else:
+            results = score_records_parallel(records, "jsonl", header, "supplier", shard_size, workers)
+        for result in results:
+            scored += len(result.names)
+    return scored, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark serial vs process-pool batch scoring")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts (default: 1..CPUs, doubling)")
+    parser.add_argument("--shard-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpus:
+            worker_counts.append(worker_counts[-1] * 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "intake.jsonl")
+        write_intake(path, args.rows)
+        runs = []
+        for workers in worker_counts:
+            scored, seconds = timed_pass(path, workers, args.shard_size)
+            runs.append({"workers": workers, "rows": scored, "seconds": round(seconds, 3),
+                         "rows_per_second": round(scored / seconds)})
+
+    baseline = runs[0]["seconds"]
+    for run in runs:
+        run["speedup"] = round(baseline / run["seconds"], 2)
+    print(json.dumps({"cpus": cpus, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# run_benchmarks.py
+# Reproducible benchmark suite: filtering, name search, risk scoring and page renders on
+# synthetic catalogues of increasing size
+#
+# For each size a random but valid catalogue is generated (synthetic.generate_store) and timed:
+#   - filter: the original dict comprehension over suppliers_data vs the catalogue's metadata index
+#   - search: the original substring scan vs the catalogue's name index (exact + suggestions)
+#   - scoring: the original single-supplier computation vs AssessmentState, and the whole
+#     catalogue through score_levels / score_store
+#   - similarity: top-5 similar profiles, a full NumPy L1 scan + sort vs the catalogue's
+#     packed similarity index
+#   - pages: every page of app.py through Streamlit's AppTest harness, served from a
+#     memory-mapped catalogue file (cold first run, first render, warm rerun, form submit)
+# Timings are medians in milliseconds. The report is JSON so releases can be compared.
+#
+# Usage: python benchmarks/run_benchmarks.py [--sizes 1000,100000,1000000] [--output bench.json]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assessment_state import AssessmentState  # noqa: E402
+from catalogue import InMemoryCatalogue  # noqa: E402
+from catalogue_file import write_catalogue  # noqa: E402
+from criteria import risk_levels  # noqa: E402
+from scoring import score_levels, score_store  # noqa: E402
+from startup_profile import page_timings  # noqa: E402
+from synthetic import GEOGRAPHIES, SECTORS, generate_store  # noqa: E402
+
+SEARCH_QUERIES = ("vertex", "Nova Labs 12", "qantum", "zz-no-match")
+
+
+def median_ms(fn, repeat):
+    fn()    # Warm-up: lazy imports and first-use allocations are not part of the timing
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def legacy_records(store):
+    # Nested dict shaped like suppliers_data, for the original per-rerun scans
+    return {name: {"metadata": store.metadata(row), "profile": {}} for row, name in enumerate(store.names)}
+
+
+def legacy_filter(suppliers_data, selected_sector, selected_geography):
+    return [name for name, data in suppliers_data.items()
+            if (selected_sector == "All" or data.get("metadata", {}).get("sector") == selected_sector) and
+               (selected_geography == "All" or data.get("metadata", {}).get("geography") == selected_geography)]
+
+
+def legacy_search(suppliers_data, supplier_input):
+    input_lower = supplier_input.lower()
+    matching_suppliers = [name for name in suppliers_data.keys() if input_lower in name.lower()]
+    exact_matches = [name for name in suppliers_data.keys() if name.lower() == input_lower]
+    return matching_suppliers, exact_matches
+
+
+def legacy_overall(selected_levels):
+    # The original page computation: look up each selected option's index and truncate the average
+    from criteria import categories
+
+    scores = []
+    for cat_name, criteria_list in categories.items():
+        for crit in criteria_list:
+            scores.append(crit["Options"].index(selected_levels[f"{cat_name}_{crit['Criteria']}"]))
+    return risk_levels[int(sum(scores) / len(scores))]
+
+
+def filter_benchmarks(store, catalogue, repeat):
+    suppliers_data = legacy_records(store)
+    cases = {"all": ("All", "All"), "sector": (SECTORS[0], "All"), "sector_geography": (SECTORS[0], GEOGRAPHIES[0])}
+    start = time.perf_counter()
+    catalogue.filter(sector="All", geography="All")
+    results = {"index_build_ms": round((time.perf_counter() - start) * 1000, 3)}
+    for case, (sector, geography) in cases.items():
+        results[case] = {
+            "legacy_comprehension_ms": median_ms(lambda: legacy_filter(suppliers_data, sector, geography), repeat),
+            "catalogue_ms": median_ms(lambda: catalogue.filter(sector=sector, geography=geography), repeat),
+            "matches": len(catalogue.filter(sector=sector, geography=geography)),
+        }
+    return results
+
+
+def search_benchmarks(store, catalogue, repeat):
+    suppliers_data = dict.fromkeys(store.names)
+    start = time.perf_counter()
+    catalogue.suggest("warm up")
+    results = {"index_build_ms": round((time.perf_counter() - start) * 1000, 3)}
+    for query in SEARCH_QUERIES:
+        results[query] = {
+            "legacy_scan_ms": median_ms(lambda: legacy_search(suppliers_data, query), repeat),
+            "catalogue_ms": median_ms(lambda: (catalogue.exact(query), catalogue.suggest(query)), repeat),
+            "suggestions": len(catalogue.suggest(query)),
+        }
+    return results
+
+
+def brute_force_similar(levels, query, k=5):
+    distance = np.abs(levels.astype(np.int16) - query.astype(np.int16)).sum(axis=1)
+    return np.argsort(distance, kind="stable")[:k]
+
+
+def similarity_benchmarks(store, catalogue, repeat):
+    start = time.perf_counter()
+    catalogue.similarity_index
+    results = {"index_build_ms": round((time.perf_counter() - start) * 1000, 3)}
+    query = store.row_levels(len(store) // 2)
+    results["brute_force_ms"] = median_ms(lambda: brute_force_similar(store.levels, query), repeat)
+    results["index_ms"] = median_ms(lambda: catalogue.similar(query, 5), repeat)
+    return results
+
+
+def scoring_benchmarks(store, repeat):
+    start = time.perf_counter()
+    distinct = len(store.profiles)
+    intern_ms = round((time.perf_counter() - start) * 1000, 3)
+    profile = store.profile(0)
+    other = store.profile(len(store) - 1)
+    state = AssessmentState()
+
+    def resubmit():
+        state.update(profile)
+        state.update(other)
+        return state.overall_level
+
+    return {
+        "legacy_single_ms": median_ms(lambda: legacy_overall(profile), repeat),
+        "assessment_state_two_submits_ms": median_ms(resubmit, repeat),
+        "batch_score_levels_ms": median_ms(lambda: score_levels(store.levels), max(1, repeat // 4)),
+        "batch_score_store_ms": median_ms(lambda: score_store(store), max(1, repeat // 4)),
+        # score_store scores each distinct profile once (SupplierStore.profiles)
+        "distinct_profiles": distinct,
+        "intern_profiles_ms": intern_ms,
+    }
+
+
+def page_benchmarks(store, reruns):
+    # A fresh interpreter per catalogue, so imports and Streamlit caches start cold
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cat")
+        write_catalogue(store, path)
+        # Synthetic submits must not be recorded in the user's assessment history
+        env = dict(os.environ, TPRM_CATALOGUE=path, TPRM_HISTORY="off")
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--app-pages", "--reruns", str(reruns)],
+                                cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout)
+
+
+def run(sizes, repeat, reruns, page_sizes, distinct_profiles=None):
+    report = {"python": sys.version.split()[0], "distinct_profiles": distinct_profiles, "sizes": {}}
+    for count in sizes:
+        start = time.perf_counter()
+        store = generate_store(count, distinct_profiles=distinct_profiles and min(count, distinct_profiles))
+        catalogue = InMemoryCatalogue(store)
+        results = {"generate_ms": round((time.perf_counter() - start) * 1000, 1),
+                   "filter": filter_benchmarks(store, catalogue, repeat),
+                   "search": search_benchmarks(store, catalogue, repeat),
+                   "similarity": similarity_benchmarks(store, catalogue, repeat),
+                   "scoring": scoring_benchmarks(store, repeat)}
+        if count <= page_sizes:
+            results["pages"] = page_benchmarks(store, reruns)
+        report["sizes"][str(count)] = results
+        print(f"{count} suppliers done", file=sys.stderr)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark filtering, search, scoring and page renders")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated catalogue sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per operation")
+    parser.add_argument("--reruns", type=int, default=3, help="Warm reruns timed per page")
+    parser.add_argument("--page-sizes", type=int, default=1_000_000,
+                        help="Largest catalogue size to time page renders for")
+    parser.add_argument("--distinct-profiles", type=int,
+                        help="Draw profiles from a pool of this many distinct ones (default: all random)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--app-pages", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.app_pages:
+        print(json.dumps(page_timings(args.reruns, timeout=600, submit=True)))
+        return None
+
+    report = run([int(size) for size in args.sizes.split(",")], args.repeat, args.reruns, args.page_sizes,
+                 args.distinct_profiles)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
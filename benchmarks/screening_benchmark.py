@@ -0,0 +1,139 @@
+# screening_benchmark.py
+# Throughput of screening.py: a synthetic supplier catalogue against a synthetic watch list
+#
+# List entries and supplier names are built from one shared vocabulary of made-up words: one or
+# two "brand" words drawn uniformly, zero to two common words drawn from a Zipf-distributed
+# head of COMMON_WORDS (so "Global Trading" collides as it does in real company names), and a
+# legal form.
+# A share of the suppliers are planted variants of list entries: re-ordered tokens, a typo, a
+# different legal form, or an alias. Reports JSON: build and screening times, recall on the
+# planted variants, the number of hits and their precision (the share of suppliers with a hit
+# that are planted variants of a hit entry: any other hit counts as false, including names
+# that happen to be near-duplicates of an entry). Random names drawn from one vocabulary also
+# collide outright with list names ("Kazushifen Ltd" both ways), more often the longer the
+# list, so the hits whose name normalises exactly to a matched alias are counted separately
+# and precision is also given without them. Then the cost of an incremental re-screen
+# after a list update (entries removed and added) and whether its hits are exactly those of a
+# full re-screen of the updated list.
+#
+# Usage: python benchmarks/screening_benchmark.py [--suppliers 1000000] [--entries 500000]
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screening import ScreeningState, WatchEntry, WatchList, normalise_name  # noqa: E402
+
+SYLLABLES = ("ka", "lo", "mi", "ra", "ten", "vo", "zu", "shi", "an", "el", "dor", "pex", "qui", "sta", "nor",
+             "bel", "gra", "tri", "ux", "yo", "fen", "mar", "ko", "lin")
+LEGAL_FORMS = ("Ltd", "LLC", "GmbH", "S.A.", "Inc", "PLC", "", "", "")
+COMMON_WORDS = 1000
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize())
+    # Shuffled, so the common words (the first COMMON_WORDS) are not all alike ("Anan", "Ananan")
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def make_name(words, cum_weights, rng):
+    brand = [words[rng.randrange(COMMON_WORDS, len(words))] for _ in range(rng.randint(1, 2))]
+    common = rng.choices(words[:COMMON_WORDS], cum_weights=cum_weights, k=rng.randint(0, 2))
+    return " ".join(brand + common + [rng.choice(LEGAL_FORMS)]).strip()
+
+
+def variant(name, rng):
+    tokens = [token for token in name.split() if token not in LEGAL_FORMS]
+    change = rng.randrange(3)
+    if change == 0 and len(tokens) > 1:
+        rng.shuffle(tokens)
+    elif change == 1:
+        i = rng.randrange(len(tokens))
+        word = tokens[i]
+        pos = rng.randrange(1, len(word))
+        tokens[i] = word[:pos] + rng.choice("aeiouxz") + word[pos + 1:]
+    return " ".join(tokens + [rng.choice(LEGAL_FORMS)]).strip()
+
+
+def hits_equal(a, b):
+    return {name: sorted(hits) for name, hits in a.items()} == {name: sorted(hits) for name, hits in b.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark watch-list screening")
+    parser.add_argument("--suppliers", type=int, default=1_000_000)
+    parser.add_argument("--entries", type=int, default=500_000)
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--planted", type=float, default=0.001, help="Share of suppliers that are list variants")
+    parser.add_argument("--update", type=int, default=5_000, help="Entries added by the list update")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(11)
+    words = vocabulary(args.vocabulary, rng)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(COMMON_WORDS)))
+    entries = []
+    for i in range(args.entries):
+        name = make_name(words, weights, rng)
+        aliases = (make_name(words, weights, rng),) if rng.random() < 0.3 else ()
+        entries.append(WatchEntry(f"E{i}", name, aliases, {}))
+    # Supplier names are unique, as in a catalogue; repeats are drawn again
+    planted = {}
+    names = {}
+    while len(names) < args.suppliers:
+        if rng.random() < args.planted:
+            entry = rng.choice(entries)
+            name = variant(rng.choice((entry.name, *entry.aliases)), rng)
+            if name not in names:
+                planted[name] = entry.id
+        else:
+            name = make_name(words, weights, rng)
+        names.setdefault(name, None)
+    names = list(names)
+
+    report = {"suppliers": args.suppliers, "entries": args.entries, "planted": len(planted)}
+    start = time.perf_counter()
+    watch_list = WatchList(entries)
+    report["index_seconds"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    results = watch_list.screen_names(names)
+    report["screen_seconds"] = round(time.perf_counter() - start, 3)
+    report["suppliers_with_hits"] = len(results)
+    found = sum(1 for name, entry_id in planted.items()
+                if any(hit.entry_id == entry_id for hit in results.get(name, ())))
+    report["planted_recall"] = round(found / max(1, len(planted)), 4)
+    report["precision"] = round(found / max(1, len(results)), 4)
+    identical = sum(1 for name, hits in results.items() if name not in planted
+                    and any(normalise_name(hit.alias) == normalise_name(name) for hit in hits))
+    report["identical_name_hits"] = identical
+    report["precision_without_identical_names"] = round(found / max(1, len(results) - identical), 4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = ScreeningState(os.path.join(tmp, "screening.sqlite"))
+        report["initial_rescreen"] = state.rescreen(names, entries)
+        updated = entries[args.update:] + [WatchEntry(f"N{i}", make_name(words, weights, rng), (), {})
+                                           for i in range(args.update)]
+        start = time.perf_counter()
+        report["incremental_rescreen"] = state.rescreen(names, updated)
+        report["incremental_rescreen"]["seconds"] = round(time.perf_counter() - start, 3)
+        full = ScreeningState(os.path.join(tmp, "full.sqlite"))
+        full.rescreen(names, updated)
+        report["incremental_rescreen"]["matches_full_rescreen"] = hits_equal(state.hits(), full.hits())
+        full.close()
+        state.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
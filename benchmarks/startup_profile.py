@@ -0,0 +1,136 @@
+# startup_profile.py
+# Startup and rerun timing report for app.py
+#
+# Reports, as JSON:
+#   - an import-time breakdown of the modules app.py imports (python -X importtime, run in a
+#     fresh interpreter so nothing is cached), aggregated per top-level package
+#   - time to first render of each page through Streamlit's AppTest harness: the cold first
+#     run (imports + catalogue load + render) and the median of warm reruns
+#
+# Usage: python benchmarks/startup_profile.py [--reruns 5] [--output startup.json]
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+def app_imports():
+    # Top-level modules imported at the top of app.py
+    tree = ast.parse(open(APP_PATH, encoding="utf-8").read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+
+# Heavy dependencies that should only load on the code paths that need them
+WATCHED_PACKAGES = ("numpy", "pandas", "matplotlib", "pyarrow")
+
+
+def import_breakdown(modules, top=15):
+    """Cumulative import time per top-level package, in milliseconds, from a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    watched = dict.fromkeys(WATCHED_PACKAGES)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip() in watched:
+            watched[name.strip()] = round(int(cumulative) / 1000, 1)
+        # Nested imports are indented under their importer; only count outermost ones
+        if name.startswith("  "):
+            continue
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(cumulative)
+        total_us += int(cumulative)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"total_ms": round(total_us / 1000, 1),
+            "packages_ms": {package: round(us / 1000, 1) for package, us in ranked},
+            # None means the package is not imported at startup at all
+            "watched_ms": watched}
+
+
+def _timed_run(app_test):
+    start = time.perf_counter()
+    app_test.run()
+    elapsed = time.perf_counter() - start
+    if app_test.exception:
+        raise RuntimeError(app_test.exception[0].value)
+    return elapsed * 1000
+
+
+def page_timings(reruns, timeout=120, submit=False):
+    """Cold first render and warm rerun times, in milliseconds, for every page of the app.
+
+    With submit=True, also times submitting the sidebar form on the first page.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # The app runs in this process: keep its reruns out of the user's assessment history
+    os.environ["TPRM_HISTORY"] = "off"
+    app_test = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timings = {}
+    cold_ms = _timed_run(app_test)
+    pages = app_test.sidebar.radio[0].options
+    for page in pages:
+        app_test.sidebar.radio[0].set_value(page)
+        first_ms = _timed_run(app_test)
+        warm = [_timed_run(app_test) for _ in range(reruns)]
+        timings[page] = {"first_render_ms": round(first_ms, 1),
+                         "rerun_median_ms": round(statistics.median(warm), 1)}
+    timings[pages[0]]["cold_start_ms"] = round(cold_ms, 1)
+
+    if submit:
+        # Submitting the sidebar form: scoring, result lines and the distribution chart
+        app_test.sidebar.radio[0].set_value(pages[0])
+        _timed_run(app_test)
+        submits = []
+        for _ in range(reruns):
+            [button for button in app_test.button if button.label == "Classify Supplier"][0].click()
+            submits.append(_timed_run(app_test))
+        timings[pages[0]]["submit_median_ms"] = round(statistics.median(submits), 1)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app.py startup and rerun times")
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns timed per page")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    modules = app_imports()
+    report = {
+        "python": sys.version.split()[0],
+        "catalogue": os.environ.get("TPRM_CATALOGUE", "suppliers_data.py"),
+        "imports": import_breakdown(modules),
+        "pages": page_timings(args.reruns),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
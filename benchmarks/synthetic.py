@@ -0,0 +1,70 @@
+# synthetic.py
+# Generates synthetic supplier databases shaped like suppliers_data for benchmarking
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from criteria import categories  # noqa: E402
+
+SECTORS = ["Technology", "Cloud Services", "Enterprise Software", "Hardware", "Financial Services",
+           "Telecom", "Healthcare", "Consulting & Professional Services", "Retail & E-commerce",
+           "Industrial", "Energy", "Automotive", "Consumer Goods", "Logistics", "Media"]
+GEOGRAPHIES = ["USA", "Germany", "Ireland", "China", "India", "South Korea", "Japan", "UK",
+               "France", "Brazil", "Canada", "Morocco", "Singapore", "Mexico", "Netherlands"]
+SIZES = ["Small", "Medium", "Large", "Multinational"]
+
+_NAME_PARTS = ["Global", "Advanced", "United", "Blue", "North", "Pacific", "Digital", "Prime",
+               "Atlas", "Nova", "Vertex", "Summit", "Apex", "Quantum", "Green", "Silver"]
+_NAME_KINDS = ["Systems", "Solutions", "Logistics", "Networks", "Consulting", "Industries",
+               "Technologies", "Partners", "Services", "Labs", "Holdings", "Group"]
+
+
+def supplier_name(rng, i):
+    return f"{rng.choice(_NAME_PARTS)} {rng.choice(_NAME_KINDS)} {i}"
+
+
+def generate_suppliers(count, seed=0):
+    """Return a nested {name: {"metadata": ..., "profile": ...}} dict with valid random profiles."""
+    rng = random.Random(seed)
+    criteria = [(f"{cat_name}_{crit['Criteria']}", crit['Options'])
+                for cat_name, criteria_list in categories.items() for crit in criteria_list]
+    suppliers = {}
+    for i in range(count):
+        suppliers[supplier_name(rng, i)] = {
+            "metadata": {
+                "sector": rng.choice(SECTORS),
+                "geography": rng.choice(GEOGRAPHIES),
+                "size": rng.choice(SIZES),
+            },
+            "profile": {key: rng.choice(options) for key, options in criteria},
+        }
+    return suppliers
+
+
+def generate_store(count, seed=0, distinct_profiles=None):
+    """Return a SupplierStore of `count` random suppliers, generated column-wise for large counts.
+
+    With `distinct_profiles`, suppliers draw their profile from a pool of that many, like real
+    catalogues where many vendors share identical assessments.
+    """
+    import numpy as np
+
+    from supplier_store import SupplierStore, _code_dtype
+
+    rng = np.random.default_rng(seed)
+    parts = rng.integers(len(_NAME_PARTS), size=count).tolist()
+    kinds = rng.integers(len(_NAME_KINDS), size=count).tolist()
+    names = [f"{_NAME_PARTS[p]} {_NAME_KINDS[k]} {i}" for i, (p, k) in enumerate(zip(parts, kinds))]
+    # Option indexes are drawn per criterion, so every profile is valid for `categories`
+    option_counts = [len(crit['Options']) for criteria_list in categories.values() for crit in criteria_list]
+    pool_size = count if distinct_profiles is None else distinct_profiles
+    levels = np.stack([rng.integers(n, size=pool_size, dtype=np.uint8) for n in option_counts], axis=1)
+    if distinct_profiles is not None:
+        levels = levels[rng.integers(pool_size, size=count)]
+    metadata_values = {"sector": list(SECTORS), "geography": list(GEOGRAPHIES), "size": list(SIZES)}
+    metadata_codes = {field: rng.integers(len(values), size=count).astype(_code_dtype(len(values)))
+                      for field, values in metadata_values.items()}
+    return SupplierStore(names, levels, metadata_values, metadata_codes)
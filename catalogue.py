@@ -0,0 +1,127 @@
+# catalogue.py
+# Supplier catalogue interface used by the app, plus the in-memory implementation
+#
+# A catalogue answers the questions the pages ask: is a supplier known, what are its metadata
+# and profile, which values does a metadata field take (with counts), which suppliers match a
+# set of filters, which names match a search, and which suppliers have the closest risk
+# profiles. Backends push these down to whatever indexes they have (see sqlite_catalogue.py
+# for the SQLite implementation).
+
+from abc import ABC, abstractmethod
+
+from metadata_index import MetadataIndex
+from name_search import NameSearchIndex
+from similarity import ProfileSimilarityIndex
+
+
+class SupplierCatalogue(ABC):
+    """Read-only supplier catalogue."""
+
+    @property
+    @abstractmethod
+    def version(self):
+        """Content version, used to key caches of derived data."""
+
+    @abstractmethod
+    def __contains__(self, name):
+        ...
+
+    @abstractmethod
+    def __len__(self):
+        ...
+
+    @abstractmethod
+    def metadata(self, name):
+        """{"sector": ..., "geography": ..., "size": ...} for a known supplier."""
+
+    @abstractmethod
+    def profile(self, name):
+        """{"{category}_{criterion}": option} for all criteria of a known supplier."""
+
+    @abstractmethod
+    def facet_counts(self, field):
+        """{value: supplier count} for a metadata field, sorted by value."""
+
+    @abstractmethod
+    def filter(self, **filters):
+        """Names matching every field=value filter; "All" or None matches everything."""
+
+    @abstractmethod
+    def exact(self, query):
+        """Catalogue name equal to the query ignoring case, or None."""
+
+    @abstractmethod
+    def suggest(self, query, limit=10):
+        """Ranked name suggestions: substring matches first, then typo-tolerant matches."""
+
+    @abstractmethod
+    def similar(self, levels, limit=5, exclude=None):
+        """[(name, L1 distance)] of the suppliers closest to a profile's option indexes."""
+
+    @abstractmethod
+    def to_store(self):
+        """The whole catalogue as a SupplierStore, for batch scoring and analytics."""
+
+
+class InMemoryCatalogue(SupplierCatalogue):
+    """Catalogue over an in-memory (or memory-mapped) SupplierStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self._metadata_index = None
+        self._search_index = None
+        self._similarity_index = None
+
+    @property
+    def version(self):
+        return self.store.version
+
+    @property
+    def metadata_index(self):
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self.store)
+        return self._metadata_index
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            self._search_index = NameSearchIndex(self.store.names)
+        return self._search_index
+
+    @property
+    def similarity_index(self):
+        if self._similarity_index is None:
+            self._similarity_index = ProfileSimilarityIndex(self.store)
+        return self._similarity_index
+
+    def __contains__(self, name):
+        return name in self.store
+
+    def __len__(self):
+        return len(self.store)
+
+    def metadata(self, name):
+        return self.store.metadata(self.store.row(name))
+
+    def profile(self, name):
+        return self.store.profile(self.store.row(name))
+
+    def facet_counts(self, field):
+        index = self.metadata_index
+        return {value: index.count(field, value) for value in index.values(field)}
+
+    def filter(self, **filters):
+        return self.metadata_index.select(**filters)
+
+    def exact(self, query):
+        return self.search_index.exact(query)
+
+    def suggest(self, query, limit=10):
+        return self.search_index.suggest(query, limit)
+
+    def similar(self, levels, limit=5, exclude=None):
+        matches = self.similarity_index.nearest(levels, limit, exclude=self.store.name_index.get(exclude))
+        return [(self.store.names[row], distance) for row, distance in matches]
+
+    def to_store(self):
+        return self.store
@@ -0,0 +1,141 @@
+# catalogue_file.py
+# File-backed supplier catalogue: a compact binary file opened with mmap
+#
+# Layout (little-endian):
+#   header    magic, format version, criteria count, supplier count, section offsets, content version
+#   metadata  UTF-8 JSON: criteria keys, supplier names, metadata values and code column layout
+#   codes     one integer code column per metadata field
+#   levels    supplier x criterion uint8 matrix of option indexes, 64-byte aligned
+#
+# Opening a catalogue parses only the header and the metadata section. The levels matrix stays
+# on disk behind the mmap, so a supplier's profile is paged in and decoded only when accessed.
+#
+# Usage:
+#   python catalogue_file.py build suppliers.cat    # export the bundled suppliers_data
+#   python catalogue_file.py build suppliers.cat --source vendors.jsonl
+#   python catalogue_file.py info suppliers.cat
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from criteria import criteria_keys
+from supplier_store import SupplierStore
+
+MAGIC = b"TPRMCAT1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQ32s")
+_ALIGN = 64
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def write_catalogue(store, path):
+    """Write a SupplierStore to `path` atomically (temp file + rename)."""
+    fields = list(store.metadata_codes)
+    columns = []
+    offset = 0
+    for field in fields:
+        column = np.ascontiguousarray(store.metadata_codes[field])
+        columns.append({"field": field, "dtype": column.dtype.str, "offset": offset})
+        offset = _aligned(offset + column.nbytes)
+
+    metadata = json.dumps({
+        "criteria": list(criteria_keys),
+        "names": store.names,
+        "metadata_values": store.metadata_values,
+        "columns": columns,
+    }, ensure_ascii=False).encode("utf-8")
+
+    metadata_offset = _HEADER.size
+    codes_offset = _aligned(metadata_offset + len(metadata))
+    levels_offset = _aligned(codes_offset + offset)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(criteria_keys), len(store),
+                             metadata_offset, len(metadata), codes_offset, levels_offset,
+                             store.version.encode("ascii")))
+        f.write(metadata)
+        for field, column in zip(fields, columns):
+            f.seek(codes_offset + column["offset"])
+            f.write(np.ascontiguousarray(store.metadata_codes[field]).tobytes())
+        f.seek(levels_offset)
+        for chunk in store.level_chunks():
+            f.write(np.ascontiguousarray(chunk, dtype=np.uint8).tobytes())
+        # Seeking past the end does not extend a file: an empty store must still reach levels_offset
+        f.truncate(levels_offset + len(store) * len(criteria_keys))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def open_catalogue(path):
+    """Open a catalogue file as a SupplierStore whose levels matrix is memory-mapped."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, format_version, criteria_count, count, metadata_offset, metadata_length,
+     codes_offset, levels_offset, version) = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f"{path}: not a supplier catalogue file (format {FORMAT_VERSION})")
+
+    metadata = json.loads(buffer[metadata_offset:metadata_offset + metadata_length].decode("utf-8"))
+    if metadata["criteria"] != list(criteria_keys):
+        raise ValueError(f"{path}: criteria do not match the current framework, rebuild the catalogue")
+
+    codes = {}
+    for column in metadata["columns"]:
+        codes[column["field"]] = np.frombuffer(buffer, dtype=np.dtype(column["dtype"]), count=count,
+                                               offset=codes_offset + column["offset"])
+    levels = np.frombuffer(buffer, dtype=np.uint8, count=count * criteria_count,
+                           offset=levels_offset).reshape(count, criteria_count)
+    return SupplierStore(metadata["names"], levels, metadata["metadata_values"], codes,
+                         version=version.decode("ascii"))
+
+
+def load_source_store(source=None):
+    """SupplierStore from a .cat catalogue file, a JSONL of suppliers_data-shaped records, or
+    (when `source` is None) the bundled suppliers_data."""
+    if source is None:
+        from suppliers_data import suppliers_data as supplier_records
+    elif source.endswith(".cat"):
+        return open_catalogue(source)
+    else:
+        with open(source, encoding="utf-8") as f:
+            supplier_records = {record["supplier"]: record
+                                for record in (json.loads(line) for line in f if line.strip())}
+    return SupplierStore.from_records(supplier_records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a supplier catalogue file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Export the bundled suppliers_data to a catalogue file")
+    build.add_argument("path")
+    build.add_argument("--source", help="JSONL of suppliers_data-shaped records with a 'supplier' name "
+                                        "(default: the bundled suppliers_data)")
+    info = commands.add_parser("info", help="Print a catalogue file summary")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        store = load_source_store(args.source)
+        write_catalogue(store, args.path)
+        print(f"Wrote {len(store)} suppliers to {args.path}")
+    else:
+        store = open_catalogue(args.path)
+        print(f"{args.path}: {len(store)} suppliers, version {store.version}, "
+              f"metadata fields {', '.join(store.metadata_values)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
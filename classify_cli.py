@@ -0,0 +1,129 @@
+# classify_cli.py
+# Headless bulk classifier: streams supplier assessments from CSV or JSONL and writes
+# one classification per supplier, without Streamlit and without loading the whole file.
+#
+# Input rows use the same "{category}_{criterion}" keys as suppliers_data profiles.
+# JSONL records may be flat or nested like suppliers_data entries ({"profile": {...}}).
+#
+# Usage:
+#   python classify_cli.py intake.csv -o classified.csv
+#   cat intake.jsonl | python classify_cli.py - --input-format jsonl --output-format jsonl
+#   python classify_cli.py intake.jsonl -o classified.csv --workers 0   # one process per CPU
+
+import argparse
+import csv
+import json
+import sys
+
+from batch_scoring import FORMATS, check_header, iter_records, score_records, score_records_parallel
+from criteria import risk_levels
+from scoring import default_model, load_model
+
+OUTPUT_FIELDS = ["supplier", "overall_risk", "average_risk_index"] + risk_levels
+
+
+def detect_format(path, default=None):
+    for fmt, suffixes in (("csv", (".csv",)), ("jsonl", (".jsonl", ".ndjson", ".json"))):
+        if path.lower().endswith(suffixes):
+            return fmt
+    return default
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(OUTPUT_FIELDS)
+
+    def write(self, name, overall, average, counts):
+        self.writer.writerow([name, overall, average] + counts)
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, name, overall, average, counts):
+        record = dict(zip(OUTPUT_FIELDS, [name, overall, average] + counts))
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter}
+
+
+def classify_stream(results, writer, errors=sys.stderr):
+    """Write batch_scoring ShardResults in order; returns (classified, rejected)."""
+    classified = rejected = 0
+    for result in results:
+        for line_no, message in result.errors:
+            print(f"line {line_no}: {message}", file=errors)
+        rejected += len(result.errors)
+        for i, name in enumerate(result.names):
+            writer.write(name, risk_levels[result.overall_index[i]], float(result.average_index[i]),
+                         result.counts[i].tolist())
+        classified += len(result.names)
+    return classified, rejected
+
+
+def open_input(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, newline="", encoding="utf-8-sig")
+
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify supplier assessments from CSV or JSONL")
+    parser.add_argument("input", help="Input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--input-format", choices=FORMATS, help="Default: from the input file extension")
+    parser.add_argument("--output-format", choices=FORMATS, help="Default: from the output file extension, else csv")
+    parser.add_argument("--name-field", default="supplier", help="Column/key holding the supplier name")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Rows scored per batch (default: 1000, or 10000 per shard with --workers)")
+    parser.add_argument("--model", help="JSON scoring model definition (default: unweighted average, see scoring.py)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Score shards on this many processes (0: one per CPU; default: 1, no pool)")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or detect_format(args.input)
+    if input_format is None:
+        parser.error("cannot infer the input format, use --input-format")
+    output_format = args.output_format or detect_format(args.output, default="csv")
+    if args.workers < 0:
+        parser.error("--workers must be 0 or more")
+
+    model = load_model(args.model) if args.model else default_model
+
+    source = open_input(args.input)
+    target = open_output(args.output)
+    try:
+        header, records = iter_records(source, input_format)
+        if header is not None:
+            try:
+                check_header(header, args.name_field)
+            except ValueError as exc:
+                # A wrong header would reject (or mis-score) every row: stop before scoring any
+                parser.error(f"{args.input}: {exc}")
+        if args.workers == 1:
+            results = score_records(records, input_format, header, args.name_field, args.batch_size or 1000, model)
+        else:
+            results = score_records_parallel(records, input_format, header, args.name_field,
+                                             args.batch_size or 10000, args.workers or None, model)
+        classified, rejected = classify_stream(results, WRITERS[output_format](target))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    print(f"Classified {classified} suppliers, rejected {rejected}", file=sys.stderr)
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# criteria.py
+# Contains the TPRM classification framework: risk categories, criteria and risk levels,
+# plus lookup tables compiled from them once at import
+
+from collections import namedtuple
+from types import MappingProxyType
+
+# Define the data for each category
+categories = {
+    "1️⃣ Supplier General Characteristics": [
+        {"Criteria": "Supplier criticality", "Options": ["Core business dependency", "Important service", "Support service", "Non-essential"]},
+        {"Criteria": "Supplier size", "Options": ["Very small / unstable", "Medium", "Large", "Multinational"]},
+        {"Criteria": "Years of activity", "Options": ["< 2 years", "2–5 years", "5–10 years", ">10 years"]},
+        {"Criteria": "Dependency level", "Options": ["Single supplier", "Few alternatives", "Multiple suppliers", "Easily replaceable"]}
+    ],
+    "2️⃣ Geographical Risk Criteria": [
+        {"Criteria": "Country risk", "Options": ["Sanctioned / unstable", "Politically sensitive", "Emerging economy", "Stable country"]},
+        {"Criteria": "Data hosting location", "Options": ["High-risk country", "Mixed locations", "Regulated region", "Local / EU"]},
+        {"Criteria": "Regulatory alignment", "Options": ["No clear regulation", "Partial compliance", "Local compliance", "GDPR / strong laws"]},
+        {"Criteria": "Cross-border data flow", "Options": ["Uncontrolled", "Limited control", "Contractual control", "Fully regulated"]}
+    ],
+    "3️⃣ Sector & Activity Criteria": [
+        {"Criteria": "Sector sensitivity", "Options": ["Finance / Health", "Telecom / Gov", "IT services", "Non-sensitive"]},
+        {"Criteria": "Service type", "Options": ["Core operations", "Business support", "Technical support", "Administrative"]},
+        {"Criteria": "System access", "Options": ["Full privileged access", "High access", "Limited access", "No access"]},
+        {"Criteria": "Process outsourcing", "Options": ["Full outsourcing", "Partial", "Limited", "None"]}
+    ],
+    "4️⃣ Information Security & Cyber Risk": [
+        {"Criteria": "Data sensitivity", "Options": ["Highly confidential", "Personal data", "Internal data", "Public data"]},
+        {"Criteria": "Security certification", "Options": ["None", "In progress", "Partial", "ISO 27001 / SOC2"]},
+        {"Criteria": "Incident history", "Options": ["Repeated incidents", "Major incident", "Minor incidents", "None"]},
+        {"Criteria": "Access management", "Options": ["No control", "Weak controls", "Standard controls", "Strong IAM"]}
+    ],
+    "5️⃣ Business Continuity & Operational Risk": [
+        {"Criteria": "BCP / DRP", "Options": ["Not existing", "Informal", "Documented", "Tested & audited"]},
+        {"Criteria": "RTO / RPO", "Options": ["Undefined", "Very high", "Moderate", "Optimized"]},
+        {"Criteria": "SLA availability", "Options": ["No SLA", "Weak SLA", "Standard SLA", "Strong SLA"]},
+        {"Criteria": "Subcontracting", "Options": ["Unknown", "Multiple", "Limited", "Controlled"]}
+    ],
+    "6️⃣ Financial & Legal Risk": [
+        {"Criteria": "Financial stability", "Options": ["Loss-making", "Weak cash flow", "Stable", "Strong growth"]},
+        {"Criteria": "Legal compliance", "Options": ["Non-compliant", "Partial", "Mostly compliant", "Fully compliant"]},
+        {"Criteria": "Insurance", "Options": ["None", "Limited", "Adequate", "Full coverage"]},
+        {"Criteria": "Litigation history", "Options": ["Frequent", "Occasional", "Rare", "None"]}
+    ],
+    "7️⃣ ESG & Ethical Criteria": [
+        {"Criteria": "Ethics policy", "Options": ["None", "Informal", "Documented", "Enforced"]},
+        {"Criteria": "Anti-corruption", "Options": ["No controls", "Weak controls", "Internal policy", "Audited program"]},
+        {"Criteria": "Environmental impact", "Options": ["Harmful", "Uncontrolled", "Managed", "Sustainable"]},
+        {"Criteria": "Social responsibility", "Options": ["Violations", "Weak HR practices", "Basic", "Certified / audited"]}
+    ]
+}
+
+# Risk levels mapping: lower index is higher risk
+risk_levels = ["Critical", "High", "Medium", "Low"]
+
+# Compiled criterion: id is its column in option-index rows, option_index maps option -> index
+Criterion = namedtuple("Criterion", ["id", "key", "category", "name", "options", "option_index"])
+
+
+def compile_criteria(categories):
+    compiled = []
+    for cat_name, criteria_list in categories.items():
+        for crit in criteria_list:
+            options = tuple(crit['Options'])
+            if len(options) != len(risk_levels):
+                raise ValueError(f"{cat_name} / {crit['Criteria']}: expected {len(risk_levels)} options, got {len(options)}")
+            compiled.append(Criterion(
+                id=len(compiled),
+                key=f"{cat_name}_{crit['Criteria']}",
+                category=cat_name,
+                name=crit['Criteria'],
+                options=options,
+                option_index=MappingProxyType({option: i for i, option in enumerate(options)}),
+            ))
+    return tuple(compiled)
+
+
+# Frozen lookup tables: criterion id -> Criterion, key -> criterion id, category -> criteria
+criteria_table = compile_criteria(categories)
+criterion_ids = MappingProxyType({crit.key: crit.id for crit in criteria_table})
+criteria_by_category = MappingProxyType({
+    cat_name: tuple(crit for crit in criteria_table if crit.category == cat_name) for cat_name in categories
+})
+
+# Profile keys in framework order, as used by suppliers_data profiles ("{category}_{criterion}")
+criteria_keys = tuple(crit.key for crit in criteria_table)
+
+# Criteria set from outside data: providers (enrichment.py) and watch-list hits (screening.py)
+COUNTRY_RISK = criteria_table[criterion_ids["2️⃣ Geographical Risk Criteria_Country risk"]]
+FINANCIAL_STABILITY = criteria_table[criterion_ids["6️⃣ Financial & Legal Risk_Financial stability"]]
+
+
+def validate_profile(profile, name=None):
+    """Raise ValueError if a profile has an unknown criterion key or an invalid option."""
+    for key, option in profile.items():
+        if key not in criterion_ids:
+            raise ValueError(f"Supplier {name!r}: unknown criterion {key!r}")
+        if option not in criteria_table[criterion_ids[key]].option_index:
+            raise ValueError(f"Supplier {name!r}: invalid option {option!r} for {key!r}")
@@ -0,0 +1,189 @@
+# drift.py
+# Incremental risk drift detection over the assessment history
+#
+# Compares every new assessment in the history (assessment_history.py) with the supplier's
+# previous one and records a drift event when criteria moved toward Critical (a lower option
+# index) or the overall level changed. The job keeps a watermark, the highest assessment id
+# it has processed, in the history database: each run reads only the assessments above it,
+# finds each one's predecessor with an index seek on (supplier_id, assessed_at), diffs the
+# 28 levels of the whole batch at once and stores the events and the new watermark in one
+# transaction. A run therefore costs time in proportion to the new assessments, not to the
+# catalogue or the history, and a crashed run is simply repeated.
+#
+# An assessment appended with an earlier assessed_at than the supplier's later ones (a
+# back-fill) becomes the predecessor of an assessment that may already have been diffed;
+# that successor is diffed again and its event replaced (or removed) in the same transaction.
+#
+# Usage:
+#   python drift.py history.sqlite [--interval 300] [--batch-size 10000]
+
+import argparse
+import datetime
+import json
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from criteria import criteria_table, risk_levels
+
+# New assessments diffed per transaction
+DRIFT_BATCH_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drift_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS drift_events (
+    assessment_id INTEGER PRIMARY KEY,
+    previous_id INTEGER NOT NULL,
+    supplier_id INTEGER NOT NULL,
+    assessed_at REAL NOT NULL,
+    overall_from INTEGER NOT NULL,
+    overall_to INTEGER NOT NULL,
+    escalated BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drift_events_time ON drift_events (assessed_at);
+"""
+
+# Each assessment with its predecessor: the latest earlier assessment of the supplier
+_PAIRS = """
+SELECT a.id, a.supplier_id, s.name, a.assessed_at, a.levels, a.overall, p.id, p.levels, p.overall
+FROM assessments a
+JOIN suppliers s ON s.id = a.supplier_id
+JOIN assessments p ON p.id = (
+    SELECT id FROM assessments
+    WHERE supplier_id = a.supplier_id
+      AND (assessed_at < a.assessed_at OR (assessed_at = a.assessed_at AND id < a.id))
+    ORDER BY assessed_at DESC, id DESC LIMIT 1)
+"""
+_NEW_PAIRS = _PAIRS + "WHERE a.id > ? AND a.id <= ?"
+_LISTED_PAIRS = _PAIRS + "WHERE a.id IN (SELECT value FROM json_each(?))"
+
+# The successor (next assessment in time) of each new assessment, if any
+_SUCCESSORS = """
+SELECT (SELECT id FROM assessments
+        WHERE supplier_id = n.supplier_id
+          AND (assessed_at > n.assessed_at OR (assessed_at = n.assessed_at AND id > n.id))
+        ORDER BY assessed_at, id LIMIT 1)
+FROM assessments n WHERE n.id > ? AND n.id <= ?
+"""
+
+DriftEvent = namedtuple("DriftEvent", ["assessment_id", "previous_id", "supplier", "assessed_at", "overall_from",
+                                       "overall_to", "escalated"])
+
+
+def escalations(current, previous):
+    """Boolean (N, criteria) mask of criteria whose option index fell, i.e. moved toward Critical."""
+    return current < previous
+
+
+class DriftDetector:
+    """Drift job state (watermark and events), kept in the assessment history database."""
+
+    def __init__(self, path, timeout=30.0):
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    @property
+    def watermark(self):
+        row = self.conn.execute("SELECT value FROM drift_state WHERE key = 'watermark'").fetchone()
+        return row[0] if row else 0
+
+    def run(self, batch_size=DRIFT_BATCH_SIZE):
+        """Diff every assessment above the watermark; returns (assessments processed, [DriftEvent])."""
+        processed, events = 0, []
+        while True:
+            watermark = self.watermark
+            upper, count = self.conn.execute(
+                "SELECT MAX(id), COUNT(*) FROM (SELECT id FROM assessments WHERE id > ? ORDER BY id LIMIT ?)",
+                (watermark, batch_size)).fetchone()
+            if not count:
+                return processed, events
+            events += self._process(watermark, upper)
+            processed += count
+
+    def _process(self, watermark, upper):
+        # First assessments of a supplier have no predecessor and are skipped by the join
+        rows = self.conn.execute(_NEW_PAIRS, (watermark, upper)).fetchall()
+        # Successors already diffed (at or below the watermark) of back-filled assessments
+        rediffed = sorted({row[0] for row in self.conn.execute(_SUCCESSORS, (watermark, upper))
+                           if row[0] is not None and row[0] <= watermark})
+        if rediffed:
+            rows += self.conn.execute(_LISTED_PAIRS, (json.dumps(rediffed),)).fetchall()
+        events = []
+        if rows:
+            width = len(criteria_table)
+            current = np.frombuffer(b"".join(row[4] for row in rows), dtype=np.uint8).reshape(-1, width)
+            previous = np.frombuffer(b"".join(row[7] for row in rows), dtype=np.uint8).reshape(-1, width)
+            escalated = escalations(current, previous)
+            overall_from = np.array([row[8] for row in rows])
+            overall_to = np.array([row[5] for row in rows])
+            for i in np.flatnonzero(escalated.any(axis=1) | (overall_from != overall_to)).tolist():
+                assessment_id, supplier_id, name, assessed_at, _, overall, previous_id, _, previous_overall = rows[i]
+                events.append((supplier_id, DriftEvent(assessment_id, previous_id, name, assessed_at, previous_overall,
+                                                       overall, np.flatnonzero(escalated[i]).tolist())))
+        with self.conn:
+            if rediffed:
+                self.conn.execute("DELETE FROM drift_events WHERE assessment_id IN (SELECT value FROM json_each(?))",
+                                  (json.dumps(rediffed),))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO drift_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(e.assessment_id, e.previous_id, supplier_id, e.assessed_at, e.overall_from, e.overall_to,
+                  bytes(e.escalated)) for supplier_id, e in events])
+            self.conn.execute("INSERT OR REPLACE INTO drift_state VALUES ('watermark', ?)", (upper,))
+        return [event for _, event in events]
+
+    def events(self, since=None, limit=100):
+        """Most recent DriftEvents (assessed after `since`, Unix time), newest first."""
+        rows = self.conn.execute(
+            "SELECT e.assessment_id, e.previous_id, s.name, e.assessed_at, e.overall_from, e.overall_to, e.escalated "
+            "FROM drift_events e JOIN suppliers s ON s.id = e.supplier_id "
+            "WHERE e.assessed_at > ? ORDER BY e.assessed_at DESC LIMIT ?",
+            (since or 0.0, limit)).fetchall()
+        return [DriftEvent(*row[:6], list(row[6])) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def describe(event):
+    """One line for a drift event."""
+    when = datetime.datetime.fromtimestamp(event.assessed_at).isoformat(sep=" ", timespec="seconds")
+    parts = []
+    if event.overall_from != event.overall_to:
+        parts.append(f"overall {risk_levels[event.overall_from]} -> {risk_levels[event.overall_to]}")
+    if event.escalated:
+        parts.append("toward Critical: " + ", ".join(criteria_table[crit_id].name for crit_id in event.escalated))
+    return f"{when}  {event.supplier}: " + "; ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag risk drift in new assessments since the last run")
+    parser.add_argument("path", help="Assessment history database (see assessment_history.py)")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Keep running, checking for new assessments every INTERVAL seconds")
+    parser.add_argument("--batch-size", type=int, default=DRIFT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    detector = DriftDetector(args.path)
+    try:
+        while True:
+            started = time.time()
+            processed, events = detector.run(args.batch_size)
+            for event in events:
+                print(describe(event))
+            print(f"{processed} new assessments, {len(events)} drift events (watermark {detector.watermark}, "
+                  f"{time.time() - started:.2f}s)", file=sys.stderr)
+            if args.interval is None:
+                return 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        detector.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+# enrichment.py
+# Asynchronous enrichment of supplier profiles from external risk data providers
+#
+# A provider looks up one value per supplier (a country risk score for the supplier's
+# geography, a credit rating or a sanctions flag for its name) and turns it into criterion
+# selections, e.g. "Country risk" or "Financial stability". EnrichmentPipeline fans the
+# lookups of many suppliers out on one asyncio event loop:
+#   - a semaphore bounds the requests in flight across all providers
+#   - a token bucket per provider enforces its rate limit (lookups/second, with a burst)
+#   - transient failures (timeouts, connection errors, HTTP 429/5xx) are retried with
+#     exponential backoff and jitter
+#   - values are kept in a TTL cache, and concurrent lookups of the same key share one
+#     request, so suppliers in the same country cost one country-risk request. Failed lookups
+#     are cached too, for a short failure_ttl, so a provider that is down is not retried on
+#     every lookup
+# When two providers set the same criterion, the more severe option wins.
+#
+# Providers read from a local JSON file or over HTTP (GET {url}/{key}, JSON response, 404 for
+# unknown keys). `python enrichment.py serve` runs a local stand-in HTTP provider for testing,
+# with optional latency and failure injection.
+#
+# Configuration (TPRM_ENRICHMENT=enrichment.json for the app, or the enrich command):
+#   {"concurrency": 32, "retries": 3, "timeout": 10, "cache_ttl": 86400, "failure_ttl": 60,
+#    "providers": [
+#      {"type": "country_risk", "source": "country_risk.json", "rate": 50, "burst": 10},
+#      {"type": "financial_rating", "source": "http://127.0.0.1:8765/financial_rating", "rate": 20},
+#      {"type": "sanctions", "source": "http://127.0.0.1:8765/sanctions"}]}
+#
+# Usage:
+#   python enrichment.py serve [--data stand_in.json] [--synthetic] [--port 8765]
+#   python enrichment.py enrich enrichment.json [--source vendors.jsonl] -o enriched.jsonl
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, namedtuple
+from urllib.parse import quote, unquote, urlsplit
+
+from criteria import COUNTRY_RISK, FINANCIAL_STABILITY, criteria_table, criterion_ids
+
+ENRICHMENT_CONCURRENCY = 32
+ENRICHMENT_RETRIES = 3
+ENRICHMENT_TIMEOUT = 10.0
+# Seconds a looked-up value is reused, and the most values kept
+CACHE_TTL = 24 * 3600
+CACHE_MAX_ENTRIES = 100_000
+# Seconds a failed lookup is answered from the cache with the same error
+FAILURE_TTL = 60
+
+Enrichment = namedtuple("Enrichment", ["supplier", "criteria", "sources", "errors"])
+
+_MISSING = object()
+
+
+class ProviderError(Exception):
+    """A failed lookup; `transient` errors are retried."""
+
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class TokenBucket:
+    """Rate limiter: `rate` acquisitions per second on average, up to `burst` at once.
+
+    One bucket is shared by every run, event loop and thread using a provider: the tokens are
+    taken under a lock, and only the wait for a token happens on the caller's event loop.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returning the seconds to wait before it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A negative balance is the queue of callers already waiting for a token
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ---- sources ----
+
+class FileSource:
+    """Values from a local JSON file of {key: value}, read on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        self._values = None
+
+    async def get(self, key):
+        if self._values is None:
+            with open(self.path, encoding="utf-8") as f:
+                self._values = json.load(f)
+        return self._values.get(key)
+
+
+async def _http_get(url, timeout):
+    # Minimal HTTP/1.0 GET on asyncio streams: no thread per request, no extra dependency
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if secure else None), timeout)
+    try:
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n\r\n".encode())
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, body
+
+
+class HttpSource:
+    """Values from an HTTP service: GET {url}/{key} returns the value as JSON, 404 if unknown."""
+
+    def __init__(self, url, timeout=ENRICHMENT_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    async def get(self, key):
+        try:
+            status, body = await _http_get(f"{self.url}/{quote(key, safe='')}", self.timeout)
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise ProviderError(f"{self.url}: {exc!r}", transient=True) from exc
+        if status == 404:
+            return None
+        if status == 429 or status >= 500:
+            raise ProviderError(f"{self.url}: HTTP {status}", transient=True)
+        if status != 200:
+            raise ProviderError(f"{self.url}: HTTP {status}")
+        return json.loads(body)
+
+
+def open_source(source, base_dir=".", timeout=ENRICHMENT_TIMEOUT):
+    """HttpSource for an http(s) URL, otherwise FileSource (relative to `base_dir`)."""
+    if source.startswith(("http://", "https://")):
+        return HttpSource(source, timeout)
+    return FileSource(os.path.join(base_dir, source))
+
+
+# ---- providers ----
+
+class Provider(ABC):
+    """A risk data provider: which key a supplier is looked up by, and what the value sets."""
+
+    name = None
+
+    def __init__(self, source, rate=None, burst=None):
+        self.source = source
+        self.rate = rate
+        self.burst = burst
+        # Kept with the provider, so the rate limit holds across runs and app sessions
+        self.bucket = TokenBucket(rate, burst) if rate else None
+
+    def key(self, supplier, metadata):
+        """Lookup key for a supplier, or None to skip it."""
+        return supplier
+
+    @abstractmethod
+    def criteria(self, value):
+        """{criterion key: option} for a looked-up value (None when the key is unknown)."""
+
+
+class CountryRiskProvider(Provider):
+    """Country risk index, 0 (stable) to 100 (sanctioned / unstable), by geography."""
+
+    name = "country_risk"
+    # Lowest score for each "Country risk" option, most severe first
+    BANDS = ((75, 0), (50, 1), (25, 2), (0, 3))
+
+    def key(self, supplier, metadata):
+        return metadata.get("geography")
+
+    def criteria(self, value):
+        if value is None:
+            return {}
+        index = next(index for threshold, index in self.BANDS if float(value) >= threshold)
+        return {COUNTRY_RISK.key: COUNTRY_RISK.options[index]}
+
+
+class FinancialRatingProvider(Provider):
+    """Credit rating (AAA ... D, +/- modifiers ignored) by supplier name."""
+
+    name = "financial_rating"
+    # Rating -> "Financial stability" option index (Loss-making ... Strong growth)
+    RATINGS = {"AAA": 3, "AA": 3, "A": 3, "BBB": 2, "BB": 1, "B": 1, "CCC": 0, "CC": 0, "C": 0, "D": 0}
+
+    def criteria(self, value):
+        index = self.RATINGS.get(str(value).upper().rstrip("+-")) if value is not None else None
+        if index is None:
+            return {}
+        return {FINANCIAL_STABILITY.key: FINANCIAL_STABILITY.options[index]}
+
+
+class SanctionsProvider(Provider):
+    """Sanctions flag (true when listed) by supplier name; a listed supplier is Critical on country risk."""
+
+    name = "sanctions"
+
+    def criteria(self, value):
+        return {COUNTRY_RISK.key: COUNTRY_RISK.options[0]} if value else {}
+
+
+PROVIDER_TYPES = {cls.name: cls for cls in (CountryRiskProvider, FinancialRatingProvider, SanctionsProvider)}
+
+
+# ---- pipeline ----
+
+class _Run:
+    # Per-event-loop state: asyncio primitives cannot be shared between asyncio.run() calls
+    def __init__(self, concurrency, timeout, retries):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.inflight = {}
+        self.timeout = timeout
+        self.retries = retries
+
+
+class EnrichmentPipeline:
+    """Concurrent, rate-limited, cached lookups of every provider for many suppliers."""
+
+    def __init__(self, providers, concurrency=ENRICHMENT_CONCURRENCY, retries=ENRICHMENT_RETRIES, backoff=0.5,
+                 timeout=ENRICHMENT_TIMEOUT, cache_ttl=CACHE_TTL, failure_ttl=FAILURE_TTL):
+        self.providers = list(providers)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = TTLCache(cache_ttl)
+        self.failure_ttl = failure_ttl
+        # Counters of lookups, updated by every session's thread
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """{counter: n} of requests, retries, errors, cache hits and shared lookups so far."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    async def _fetch(self, provider, key, run):
+        for attempt in range(run.retries + 1):
+            if provider.bucket is not None:
+                await provider.bucket.acquire()
+            try:
+                async with run.semaphore:
+                    self._count("requests")
+                    value = await asyncio.wait_for(provider.source.get(key), run.timeout)
+            except asyncio.TimeoutError as exc:
+                error = ProviderError(f"{provider.name}: no answer within {run.timeout}s", transient=True)
+                error.__cause__ = exc
+            except ProviderError as exc:
+                error = exc
+            else:
+                self.cache.put((provider.name, key), value)
+                return value
+            if not error.transient or attempt == run.retries:
+                self._count("errors")
+                self.cache.put((provider.name, key), error, self.failure_ttl)
+                raise error
+            self._count("retries")
+            await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    async def _lookup(self, provider, key, run):
+        value = self.cache.get((provider.name, key))
+        if value is not _MISSING:
+            self._count("cache_hits")
+            if isinstance(value, ProviderError):
+                raise ProviderError(str(value), value.transient)
+            return value
+        # Concurrent lookups of one key wait on the same request
+        task = run.inflight.get((provider.name, key))
+        if task is None:
+            task = run.inflight[provider.name, key] = asyncio.ensure_future(self._fetch(provider, key, run))
+            task.add_done_callback(lambda _: run.inflight.pop((provider.name, key), None))
+        else:
+            self._count("shared")
+        return await asyncio.shield(task)
+
+    async def _enrich_one(self, name, metadata, run):
+        lookups = [(provider, provider.key(name, metadata)) for provider in self.providers]
+        lookups = [(provider, key) for provider, key in lookups if key is not None]
+        outcomes = await asyncio.gather(*(self._lookup(provider, key, run) for provider, key in lookups),
+                                        return_exceptions=True)
+        criteria, sources, errors = {}, {}, {}
+        for (provider, _), outcome in zip(lookups, outcomes):
+            if isinstance(outcome, Exception):
+                errors[provider.name] = str(outcome)
+                continue
+            for crit_key, option in provider.criteria(outcome).items():
+                crit = criteria_table[criterion_ids[crit_key]]
+                # Lower option index = more severe
+                if crit_key not in criteria or crit.option_index[option] < crit.option_index[criteria[crit_key]]:
+                    criteria[crit_key] = option
+                    sources[crit_key] = provider.name
+        return Enrichment(name, criteria, sources, errors)
+
+    async def enrich(self, suppliers, timeout=None, retries=None):
+        """{name: Enrichment} for an iterable of (name, metadata), in input order.
+
+        `timeout` and `retries` override the pipeline's for this call (e.g. a tighter budget
+        for an interactive lookup).
+        """
+        run = _Run(self.concurrency, self.timeout if timeout is None else timeout,
+                   self.retries if retries is None else retries)
+        names, results, pending = [], {}, set()
+
+        def collect(done):
+            for task in done:
+                enrichment = task.result()
+                results[enrichment.supplier] = enrichment
+
+        for name, metadata in suppliers:
+            # A bounded window of suppliers in flight, whatever the size of the input
+            if len(pending) >= self.concurrency * 4:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+            names.append(name)
+            pending.add(asyncio.ensure_future(self._enrich_one(name, metadata or {}, run)))
+        if pending:
+            collect((await asyncio.wait(pending))[0])
+        return {name: results[name] for name in names}
+
+    def run(self, suppliers, timeout=None, retries=None):
+        """Blocking enrich() on a new event loop (for the app and the command line)."""
+        return asyncio.run(self.enrich(suppliers, timeout, retries))
+
+
+def load_pipeline(path):
+    """EnrichmentPipeline from a JSON configuration file (see the module header)."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    timeout = config.get("timeout", ENRICHMENT_TIMEOUT)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    providers = []
+    for spec in config.get("providers", []):
+        if spec.get("type") not in PROVIDER_TYPES:
+            raise ValueError(f"{path}: unknown provider type {spec.get('type')!r}, expected one of {list(PROVIDER_TYPES)}")
+        providers.append(PROVIDER_TYPES[spec["type"]](open_source(spec["source"], base_dir, timeout),
+                                                      rate=spec.get("rate"), burst=spec.get("burst")))
+    return EnrichmentPipeline(providers, concurrency=config.get("concurrency", ENRICHMENT_CONCURRENCY),
+                              retries=config.get("retries", ENRICHMENT_RETRIES), timeout=timeout,
+                              cache_ttl=config.get("cache_ttl", CACHE_TTL),
+                              failure_ttl=config.get("failure_ttl", FAILURE_TTL))
+
+
+# ---- local stand-in provider ----
+
+def stand_in_value(provider, key):
+    """Deterministic made-up value for a provider and key (for the --synthetic stand-in)."""
+    draw = int.from_bytes(hashlib.blake2b(f"{provider}/{key}".encode(), digest_size=4).digest(), "big") / 2 ** 32
+    if provider == CountryRiskProvider.name:
+        return round(draw * 100)
+    if provider == FinancialRatingProvider.name:
+        return list(FinancialRatingProvider.RATINGS)[int(draw * len(FinancialRatingProvider.RATINGS))]
+    if provider == SanctionsProvider.name:
+        return draw < 0.01
+    return None
+
+
+def serve_stand_in(data, host="127.0.0.1", port=8765, latency=0.0, failure_rate=0.0, synthetic=False):
+    """Serve {provider: {key: value}} as GET /{provider}/{key}, blocking until interrupted."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            if failure_rate and random.random() < failure_rate:
+                self.send_error(503, "Injected failure")
+                return
+            provider, _, key = self.path.lstrip("/").partition("/")
+            key = unquote(key)
+            value = data.get(provider, {}).get(key)
+            if value is None and synthetic:
+                value = stand_in_value(provider, key)
+            if value is None:
+                self.send_error(404, "Unknown key")
+                return
+            body = json.dumps(value).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"Stand-in provider on http://{host}:{server.server_port}/{{provider}}/{{key}}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enrich supplier profiles from risk data providers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Run the local stand-in HTTP provider")
+    serve.add_argument("--data", help="JSON of {provider: {key: value}}")
+    serve.add_argument("--synthetic", action="store_true", help="Answer unknown keys with made-up values")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    serve.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    enrich = commands.add_parser("enrich", help="Pre-fill profiles of a supplier source")
+    enrich.add_argument("config", help="Enrichment configuration (JSON)")
+    enrich.add_argument("--source", help="JSONL records or a .cat catalogue file (default: the bundled suppliers_data)")
+    enrich.add_argument("-o", "--output", required=True, help="JSONL of suppliers_data-shaped records")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        data = {}
+        if args.data:
+            with open(args.data, encoding="utf-8") as f:
+                data = json.load(f)
+        serve_stand_in(data, args.host, args.port, args.latency, args.failure_rate, args.synthetic)
+        return 0
+
+    from catalogue_file import load_source_store
+
+    store = load_source_store(args.source)
+    pipeline = load_pipeline(args.config)
+    start = time.perf_counter()
+    results = pipeline.run((name, store.metadata(row)) for row, name in enumerate(store.names))
+    seconds = time.perf_counter() - start
+    with open(args.output, "w", encoding="utf-8") as f:
+        for row, name in enumerate(store.names):
+            record = {"supplier": name, "metadata": store.metadata(row),
+                      "profile": {**store.profile(row), **results[name].criteria}}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    failed = sum(1 for enrichment in results.values() if enrichment.errors)
+    print(f"Enriched {len(results)} suppliers in {seconds:.1f}s ({len(results) / max(seconds, 1e-9) * 60:.0f}/min), "
+          f"{failed} with failed lookups; {pipeline.stats()}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# export.py
+# Streaming export of classification results to CSV, Parquet or Excel
+#
+# Results are produced chunk by chunk from the supplier x criterion option-index matrix:
+# each chunk is scored with a scoring model (scoring.default_model unless given) and turned
+# into an Arrow record batch whose level columns are dictionary-encoded against risk_levels,
+# then appended to the output (one Parquet row group, one block of CSV lines, or rows of a
+# write-only Excel sheet). A million-supplier export never exists as one DataFrame, and the
+# file is written to a temporary name and renamed into place when complete.
+#
+# Excel export needs openpyxl, which is optional (pip install openpyxl).
+
+import importlib.util
+import io
+import os
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+
+from criteria import criteria_table, risk_levels
+from scoring import default_model
+
+EXPORT_CHUNK_ROWS = 65536
+# Rows per sheet in the .xlsx format, header included
+EXCEL_MAX_ROWS = 1_048_576
+
+# Format -> (MIME type, file suffix)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+_LEVEL_TYPE = pa.dictionary(pa.int8(), pa.string())
+_LEVELS = pa.array(risk_levels)
+
+# Same leading columns as classify_cli output, then the risk level of every criterion
+EXPORT_SCHEMA = pa.schema(
+    [("supplier", pa.string()), ("overall_risk", _LEVEL_TYPE), ("average_risk_index", pa.float64())]
+    + [(level, pa.int64()) for level in risk_levels]
+    + [(crit.key, _LEVEL_TYPE) for crit in criteria_table]
+)
+
+
+def export_formats(rows=None):
+    """Formats whose writer dependencies are installed (and that can hold `rows` suppliers)."""
+    if rows is not None and rows >= EXCEL_MAX_ROWS:
+        return [fmt for fmt in EXPORT_FORMATS if fmt != "xlsx"]
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "xlsx" or importlib.util.find_spec("openpyxl")]
+
+
+def _level_column(indexes):
+    return pa.DictionaryArray.from_arrays(pa.array(indexes.astype(np.int8)), _LEVELS)
+
+
+def result_batches(names, levels, chunk_rows=EXPORT_CHUNK_ROWS, model=default_model, profile_ids=None):
+    """Arrow record batches of scored results, `chunk_rows` suppliers at a time.
+
+    With `profile_ids`, `levels` holds interned profiles (SupplierStore.profiles): each
+    distinct profile is scored once and its scores gathered for every supplier sharing it.
+    """
+    if profile_ids is not None:
+        profile_scores = model.score(levels)
+    for start in range(0, len(names), chunk_rows):
+        if profile_ids is None:
+            chunk = np.asarray(levels[start:start + chunk_rows], dtype=np.uint8)
+            scores = model.score(chunk)
+        else:
+            ids = profile_ids[start:start + chunk_rows]
+            chunk = levels[ids]
+            scores = profile_scores.take(ids)
+        columns = [pa.array(names[start:start + chunk_rows], type=pa.string()),
+                   _level_column(scores.overall_index),
+                   pa.array(scores.average_index)]
+        columns += [pa.array(scores.counts[:, i]) for i in range(len(risk_levels))]
+        columns += [_level_column(chunk[:, crit.id]) for crit in criteria_table]
+        yield pa.record_batch(columns, schema=EXPORT_SCHEMA)
+
+
+def _write_csv(batches, sink):
+    import pyarrow.csv
+
+    with pyarrow.csv.CSVWriter(sink, EXPORT_SCHEMA) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _write_parquet(batches, sink):
+    import pyarrow.parquet
+
+    # One row group per batch
+    with pyarrow.parquet.ParquetWriter(sink, EXPORT_SCHEMA) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _write_xlsx(batches, sink):
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ImportError("Excel export needs openpyxl: pip install openpyxl") from exc
+
+    # Write-only mode streams rows to the file instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Risk classification")
+    sheet.append(EXPORT_SCHEMA.names)
+    for batch in batches:
+        for row in zip(*(column.to_pylist() for column in batch.columns)):
+            sheet.append(row)
+    workbook.save(sink)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def write_results(names, levels, sink, fmt, model=default_model, profile_ids=None):
+    """Score and write (names, option-index matrix) to a path or binary file in `fmt`."""
+    if fmt not in _WRITERS:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {list(EXPORT_FORMATS)}")
+    if fmt == "xlsx" and len(names) >= EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(names)} suppliers do not fit in one Excel sheet, use csv or parquet")
+    _WRITERS[fmt](result_batches(names, levels, model=model, profile_ids=profile_ids), sink)
+
+
+def export_store(store, path, fmt, model=default_model):
+    """Export every supplier of a SupplierStore to `path`, written atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    try:
+        write_results(store.names, store.profiles, tmp_path, fmt, model, store.profile_ids)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def export_assessment(name, levels, fmt, model=default_model):
+    """File contents (bytes) for a single assessment, from its per-criterion option indexes."""
+    sink = io.BytesIO()
+    write_results([name], np.frombuffer(bytes(levels), dtype=np.uint8).reshape(1, -1), sink, fmt, model)
+    return sink.getvalue()
@@ -0,0 +1,71 @@
+# metadata_index.py
+# Inverted index over supplier metadata (sector, geography, size, ...) for fast filtering
+#
+# Each metadata value maps to the sorted array of store rows holding it. Per-value counts are
+# precomputed, and packed bitmaps are built on first use so that combined filters are a
+# bitwise AND instead of a scan over every supplier.
+
+import numpy as np
+
+# Filter value meaning "no constraint on this field", as used by the filter dropdowns
+ALL = "All"
+
+
+class MetadataIndex:
+    """Value -> row-set index for every metadata field of a SupplierStore."""
+
+    def __init__(self, store, fields=None):
+        self.names = store.names
+        self.size = len(store)
+        self.fields = tuple(fields or store.metadata_codes)
+        self.rows = {}
+        self.counts = {}
+        self._bitmaps = {}
+
+        for field in self.fields:
+            codes = store.metadata_codes[field]
+            values = store.metadata_values[field]
+            # Group rows by code in one sort; stable keeps rows ascending within each group
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            self.rows[field] = {value: order[bounds[code]:bounds[code + 1]] for code, value in enumerate(values)}
+            self.counts[field] = {value: int(bounds[code + 1] - bounds[code]) for code, value in enumerate(values)}
+
+    def values(self, field):
+        """Sorted distinct values of a field."""
+        return sorted(self.counts.get(field, {}))
+
+    def count(self, field, value):
+        return self.counts.get(field, {}).get(value, 0)
+
+    def bitmap(self, field, value):
+        key = (field, value)
+        if key not in self._bitmaps:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self._value_rows(field, value)] = True
+            self._bitmaps[key] = np.packbits(mask)
+        return self._bitmaps[key]
+
+    def _value_rows(self, field, value):
+        if field not in self.rows:
+            raise KeyError(f"Unknown metadata field {field!r}")
+        return self.rows[field].get(value, np.empty(0, dtype=np.intp))
+
+    def filter_rows(self, **filters):
+        """Rows matching every field=value filter, ascending; None or "All" matches everything."""
+        active = [(field, value) for field, value in filters.items() if value is not None and value != ALL]
+        if not active:
+            return np.arange(self.size)
+        if len(active) == 1:
+            return self._value_rows(*active[0])
+        if any(self.count(field, value) == 0 for field, value in active):
+            return np.empty(0, dtype=np.intp)
+
+        combined = self.bitmap(*active[0]).copy()
+        for field, value in active[1:]:
+            np.bitwise_and(combined, self.bitmap(field, value), out=combined)
+        return np.flatnonzero(np.unpackbits(combined, count=self.size))
+
+    def select(self, **filters):
+        """Supplier names matching the filters, in catalogue order."""
+        return [self.names[row] for row in self.filter_rows(**filters).tolist()]
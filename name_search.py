@@ -0,0 +1,187 @@
+# name_search.py
+# Prebuilt supplier name search: exact, prefix/substring and typo-tolerant fuzzy matching
+#
+# Names are lowercased once. A sorted copy serves prefix lookups by bisection, and a trigram
+# inverted index (postings stored as one CSR-style array) narrows substring and fuzzy
+# candidates, so a keystroke never scans the whole vendor list.
+
+import difflib
+from bisect import bisect_left
+
+import numpy as np
+
+_GRAM = 3
+# Upper bound on posting entries merged for one fuzzy query; the most common grams are dropped first
+_FUZZY_BUDGET = 100_000
+# Distinct possible grams (alphabet size cubed) up to which gram ids come from a lookup table
+_DENSE_GRAMS = 1 << 24
+
+
+def _grams(text):
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def _trigram_postings(names):
+    # ({gram: id}, rows of each gram in one array, offsets) of the trigrams of every " name ",
+    # computed with NumPy over the characters of all the names at once
+    lengths = np.array([len(name) + 2 for name in names], dtype=np.int64)
+    codes = np.frombuffer("".join(f" {name} " for name in names).encode("utf-32-le"), dtype=np.uint32)
+
+    # Characters renumbered 0..size-1, so a gram is one integer below size**3
+    present = np.bincount(codes) > 0
+    alphabet = np.flatnonzero(present).astype(np.uint32)
+    size = len(alphabet)
+    chars = (np.cumsum(present, dtype=np.int32 if size ** 3 < 2 ** 31 else np.int64) - 1)[codes]
+    # A gram starts at every character but the last two of its name
+    starts = np.ones(len(codes), dtype=bool)
+    ends = np.cumsum(lengths)
+    starts[ends - 1] = False
+    starts[ends - 2] = False
+    starts = starts[:-2]
+    grams = ((chars[:-2] * size + chars[1:-1]) * size + chars[2:])[starts]
+    rows = np.repeat(np.arange(len(names), dtype=np.int32), lengths)[:-2][starts]
+    if size ** 3 <= _DENSE_GRAMS:
+        # Small alphabet: gram ids from a presence table instead of sorting every gram
+        seen = np.zeros(size ** 3, dtype=bool)
+        seen[grams] = True
+        keys = np.flatnonzero(seen)
+        gram_ids = (np.cumsum(seen, dtype=np.int32) - 1)[grams]
+    else:
+        keys, gram_ids = np.unique(grams, return_inverse=True)
+
+    # Grouped by gram, rows ascending within a gram (a stable radix sort on 16-bit halves)
+    order = np.argsort((gram_ids & 0xFFFF).astype(np.uint16), kind="stable")
+    if len(keys) > 0x10000:
+        order = order[np.argsort((gram_ids[order] >> 16).astype(np.uint16), kind="stable")]
+    rows = rows[order]
+    grouped = np.repeat(np.arange(len(keys), dtype=np.int32), np.bincount(gram_ids, minlength=len(keys)))
+    # A gram repeated in one name counts once
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (rows[1:] != rows[:-1]) | (grouped[1:] != grouped[:-1])
+    rows = rows[keep]
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(grouped[keep], minlength=len(keys)), out=offsets[1:])
+
+    # Gram strings back from their keys, for lookups by query gram
+    base = max(size, 1)
+    digits = np.stack([keys // base ** 2, keys // base % base, keys % base], axis=1)
+    text = alphabet[digits].tobytes().decode("utf-32-le")
+    gram_ids = {text[i:i + _GRAM]: gram_id for gram_id, i in enumerate(range(0, len(text), _GRAM))}
+    return gram_ids, rows, offsets
+
+
+class NameSearchIndex:
+    """Case-insensitive search index over a list of supplier names."""
+
+    def __init__(self, names):
+        self.names = names
+        self.lower = [name.lower() for name in names]
+
+        # First catalogue occurrence wins for names differing only in case
+        self.exact_rows = {}
+        for row, name in enumerate(self.lower):
+            self.exact_rows.setdefault(name, row)
+
+        order = sorted(range(len(names)), key=self.lower.__getitem__)
+        self._sorted_lower = [self.lower[row] for row in order]
+        self._sorted_rows = order
+
+        # Trigram postings over " name " (padding gives word-boundary grams for fuzzy ranking)
+        self._gram_ids, self._postings, self._offsets = _trigram_postings(self.lower)
+        self._gram_counts = np.bincount(self._postings, minlength=len(names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _posting(self, gram):
+        gram_id = self._gram_ids.get(gram)
+        if gram_id is None:
+            return None
+        return self._postings[self._offsets[gram_id]:self._offsets[gram_id + 1]]
+
+    def exact(self, query):
+        """Catalogue name equal to the query ignoring case, or None."""
+        row = self.exact_rows.get(query.lower())
+        return None if row is None else self.names[row]
+
+    def prefix(self, query, limit=10):
+        """Names starting with the query (ignoring case), alphabetically."""
+        query = query.lower()
+        matches = []
+        position = bisect_left(self._sorted_lower, query)
+        while position < len(self._sorted_lower) and len(matches) < limit:
+            if not self._sorted_lower[position].startswith(query):
+                break
+            matches.append(self.names[self._sorted_rows[position]])
+            position += 1
+        return matches
+
+    def search(self, query, limit=10):
+        """Names containing the query (ignoring case), prefix matches first."""
+        query = query.lower()
+        if not query:
+            return []
+        matches = self.prefix(query, limit)
+        if len(matches) >= limit:
+            return matches
+        seen = set(matches)
+
+        if len(query) >= _GRAM:
+            # Rows containing every trigram of the query, rarest posting list first
+            postings = [self._posting(gram) for gram in _grams(query)]
+            if any(posting is None for posting in postings):
+                return matches
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+                if not len(candidates):
+                    return matches
+            candidates = candidates.tolist()
+        else:
+            # Shorter than a trigram: walk the postings of every indexed gram containing the query
+            candidates = (row for gram, gram_id in self._gram_ids.items() if query in gram.strip()
+                          for row in self._postings[self._offsets[gram_id]:self._offsets[gram_id + 1]].tolist())
+
+        for row in candidates:
+            if query in self.lower[row] and self.names[row] not in seen:
+                matches.append(self.names[row])
+                seen.add(self.names[row])
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def fuzzy(self, query, limit=10, min_similarity=0.5):
+        """Typo-tolerant matches ranked by similarity, e.g. "Microsft" -> "Microsoft"."""
+        query = query.lower().strip()
+        postings = sorted((posting for posting in map(self._posting, _grams(f" {query} ")) if posting is not None), key=len)
+        if not postings:
+            return []
+        # Very common grams barely discriminate; keep the rarest ones within the merge budget
+        kept = 1
+        while kept < len(postings) and sum(map(len, postings[:kept + 1])) <= _FUZZY_BUDGET:
+            kept += 1
+        postings = postings[:kept]
+
+        # Shared-trigram counts for every candidate at once, scored with the Dice coefficient
+        candidates, shared = np.unique(np.concatenate(postings), return_counts=True)
+        query_grams = max(len(query) + 3 - _GRAM, 1)
+        dice = 2.0 * shared / (self._gram_counts[candidates] + query_grams)
+
+        # Keep a small shortlist by trigram score, then re-rank it by edit similarity
+        shortlist = min(len(candidates), limit * 5)
+        top = candidates[np.argpartition(-dice, shortlist - 1)[:shortlist]]
+        ranked = []
+        for row in top.tolist():
+            similarity = difflib.SequenceMatcher(None, query, self.lower[row]).ratio()
+            if similarity >= min_similarity:
+                ranked.append((-similarity, row))
+        ranked.sort()
+        return [self.names[row] for _, row in ranked[:limit]]
+
+    def suggest(self, query, limit=10):
+        """Substring matches, topped up with fuzzy matches when there are fewer than `limit`."""
+        matches = self.search(query, limit)
+        if len(matches) < limit:
+            matches += [name for name in self.fuzzy(query, limit) if name not in matches][:limit - len(matches)]
+        return matches
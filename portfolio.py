@@ -0,0 +1,64 @@
+# portfolio.py
+# Portfolio-wide risk aggregates over the whole supplier catalogue
+#
+# Everything is computed from the supplier x criterion option-index matrix and the batch
+# scores with vectorized reductions and group-bys; no supplier is classified individually.
+
+import numpy as np
+import pandas as pd
+
+from criteria import criteria_by_category, risk_levels
+from presentation_data import display_category
+
+
+def category_scores(levels):
+    """(N, categories) matrix of each supplier's average option index per category."""
+    sizes = np.array([len(criteria) for criteria in criteria_by_category.values()])
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    # Criteria of a category are contiguous columns, so one reduceat sums every category at once
+    return np.add.reduceat(levels, starts, axis=1, dtype=np.float64) / sizes
+
+
+def portfolio_aggregates(store, scores, facets=("sector", "geography")):
+    """Overall level distribution, per-category averages and per-facet category heatmaps."""
+    categories = [display_category(cat_name) for cat_name in criteria_by_category]
+    # Category averages per distinct profile, gathered back per supplier
+    per_category = pd.DataFrame(category_scores(store.profiles)[store.profile_ids], columns=categories)
+
+    aggregates = {
+        "suppliers": len(store),
+        "overall_distribution": pd.Series(np.bincount(scores.overall_index, minlength=len(risk_levels)),
+                                          index=risk_levels),
+        "average_index": float(scores.average_index.mean()) if len(store) else float("nan"),
+        "category_average": per_category.mean(),
+    }
+    for field in facets:
+        if field not in store.metadata_codes:
+            continue
+        # Code -1 (no value for this field) becomes NaN and is dropped by the group-by
+        groups = pd.Categorical.from_codes(store.metadata_codes[field], categories=store.metadata_values[field])
+        grouped = per_category.groupby(groups, observed=True)
+        heatmap = grouped.mean()
+        heatmap.insert(0, "Suppliers", grouped.size())
+        heatmap.index = heatmap.index.astype(str)
+        aggregates[f"by_{field}"] = heatmap.sort_index()
+    return aggregates
+
+
+def heatmap_spec(heatmap, row_title):
+    """Vega-Lite heatmap of a facet x category average-index table (0 = Critical, 3 = Low)."""
+    long_form = heatmap.drop(columns="Suppliers").rename_axis(row_title).reset_index().melt(
+        id_vars=row_title, var_name="Category", value_name="Average risk index")
+    return {
+        "data": {"values": long_form.to_dict(orient="records")},
+        "mark": "rect",
+        "encoding": {
+            "y": {"field": row_title, "type": "nominal"},
+            "x": {"field": "Category", "type": "nominal", "sort": list(long_form["Category"].unique()),
+                  "axis": {"labelAngle": -30}},
+            "color": {"field": "Average risk index", "type": "quantitative",
+                      "scale": {"domain": [0, len(risk_levels) - 1], "scheme": "redyellowgreen"}},
+            "tooltip": [{"field": row_title}, {"field": "Category"},
+                        {"field": "Average risk index", "format": ".2f"}],
+        },
+    }
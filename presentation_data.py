@@ -0,0 +1,41 @@
+# presentation_data.py
+# Precomputed tables for the System Presentation page
+#
+# The tables depend only on the static criteria framework, so they are built once per process
+# as Arrow tables and shared by every session (cache_resource hands out the same object, no
+# copy, and Arrow tables need no pandas-to-Arrow conversion when sent to the browser).
+
+import streamlit as st
+
+from criteria import criteria_by_category, criteria_table, risk_levels
+
+
+def display_category(cat_name):
+    # "1️⃣ Supplier General Characteristics" -> "1 Supplier General Characteristics"
+    return cat_name.replace("️⃣", "").strip()
+
+
+@st.cache_resource(show_spinner=False)
+def criteria_matrix():
+    """One row per criterion with the option that maps to each risk level."""
+    import pyarrow as pa
+
+    columns = {
+        "Category": [display_category(crit.category) for crit in criteria_table],
+        "Criteria": [crit.name for crit in criteria_table],
+    }
+    for i, level in enumerate(risk_levels):
+        columns[f"{level} Risk"] = [crit.options[i] for crit in criteria_table]
+    return pa.table(columns)
+
+
+@st.cache_resource(show_spinner=False)
+def category_overview():
+    """One row per category with its number of criteria."""
+    import pyarrow as pa
+
+    return pa.table({
+        "Category": [display_category(cat_name) for cat_name in criteria_by_category],
+        "Criteria Count": [len(criteria) for criteria in criteria_by_category.values()],
+        "Coverage": [f"{len(criteria)} criteria" for criteria in criteria_by_category.values()],
+    })
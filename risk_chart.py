@@ -0,0 +1,64 @@
+# risk_chart.py
+# Rendering of the risk level distribution chart shown after "Classify Supplier"
+#
+# The chart depends only on the 4-tuple of per-level counts (at most 4,495 distinct tuples for
+# 28 criteria), so rendered PNGs are kept in a bounded LRU cache. Figures are created with
+# matplotlib's object API rather than pyplot, so nothing is registered in pyplot's global
+# figure list, and each figure is cleared as soon as its PNG is written. Set
+# TPRM_CHART_BACKEND=native to skip matplotlib and draw a Vega-Lite chart in the browser.
+
+import functools
+import io
+import os
+
+import streamlit as st
+
+from criteria import risk_levels
+
+CHART_BACKEND = os.environ.get("TPRM_CHART_BACKEND", "matplotlib")
+CHART_CACHE_SIZE = 1024
+CHART_COLORS = ['red', 'orange', 'yellow', 'green']
+
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def distribution_png(counts):
+    """PNG bytes of the distribution bar chart for a tuple of per-level counts."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(risk_levels, counts, color=CHART_COLORS)
+    ax.set_title('Risk Level Distribution')
+    ax.set_xlabel('Risk Level')
+    ax.set_ylabel('Number of Criteria')
+
+    buffer = io.BytesIO()
+    # Same output settings st.pyplot uses
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    fig.clear()
+    return buffer.getvalue()
+
+
+def distribution_spec(counts, title='Risk Level Distribution', y_title='Number of Criteria'):
+    """Vega-Lite spec of the distribution bar chart, rendered natively by Streamlit."""
+    return {
+        "title": title,
+        "data": {"values": [{"Risk Level": level, y_title: count}
+                            for level, count in zip(risk_levels, counts)]},
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "Risk Level", "type": "nominal", "sort": risk_levels},
+            "y": {"field": y_title, "type": "quantitative"},
+            "color": {"field": "Risk Level", "type": "nominal", "legend": None,
+                      "scale": {"domain": risk_levels, "range": CHART_COLORS}},
+        },
+    }
+
+
+def render_distribution(risk_counts):
+    """Draw the distribution chart for a {risk level: count} dict."""
+    counts = tuple(risk_counts[level] for level in risk_levels)
+    if CHART_BACKEND == "native":
+        st.vega_lite_chart(distribution_spec(counts), use_container_width=True)
+    else:
+        st.image(distribution_png(counts))
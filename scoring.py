@@ -0,0 +1,230 @@
+# scoring.py
+# Vectorized batch scoring of supplier risk profiles
+#
+# Works on N x 28 matrices of option indexes (0 = Critical ... 3 = Low, see risk_levels) and
+# reproduces the overall risk computed in risk_assessment_page: the average option index over
+# all criteria, truncated with int() to pick the overall risk level.
+#
+# Scoring models generalise that rule. A model is declared as a dict (or a JSON file):
+#
+#   {"name": "Committee",
+#    "aggregation": "mean",                 # mean | max | percentile
+#    "percentile": 25,                      # for "percentile" only
+#    "category_weights": {"2 Geographical Risk Criteria": 2},
+#    "criterion_weights": {"Country risk": 3},
+#    "knockouts": [{"criterion": "Country risk", "when": ["Critical"], "force": "Critical"}]}
+#
+# Categories are named with or without their "N️⃣" prefix, criteria by key or by name.
+# A criterion's weight is its category weight times its own (default 1; 0 ignores it).
+#   mean:       weighted average option index, truncated like the original rule
+#   max:        the most severe level of any weighted criterion
+#   percentile: the level at which the weighted share of criteria at or above that severity
+#               reaches `percentile` percent (50 = weighted median)
+# Knockouts cap the overall level: if the criterion's level is in `when`, the overall level
+# is at least as severe as `force`. compile_model() turns a definition into weight vectors and
+# knockout lookup tables once; ScoringModel.score() then evaluates whole matrices at a time.
+
+import hashlib
+import json
+
+import numpy as np
+
+from criteria import categories, criteria_table, risk_levels
+from supplier_store import intern_levels
+
+
+class RiskScores:
+    """Per-supplier scoring results for a batch of profiles."""
+
+    def __init__(self, average_index, overall_index, counts):
+        self.average_index = average_index    # float64 (N,)
+        self.overall_index = overall_index    # uint8 (N,), index into risk_levels
+        self.counts = counts                  # int64 (N, 4), criteria per risk level
+
+    def __len__(self):
+        return len(self.overall_index)
+
+    def take(self, rows):
+        """Scores of the given rows, e.g. per-supplier scores from per-profile ones."""
+        return RiskScores(self.average_index[rows], self.overall_index[rows], self.counts[rows])
+
+    @property
+    def overall_levels(self):
+        return np.asarray(risk_levels, dtype=object)[self.overall_index]
+
+    def to_frame(self, names=None):
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "average_risk_index": self.average_index,
+            "overall_risk": pd.Categorical.from_codes(self.overall_index, categories=risk_levels),
+        }, index=names)
+        for i, level in enumerate(risk_levels):
+            frame[level] = self.counts[:, i]
+        return frame
+
+
+def score_levels(levels):
+    """Score an (N, criteria) matrix of option indexes in one pass."""
+    levels = np.asarray(levels, dtype=np.uint8)
+    if levels.ndim == 1:
+        levels = levels.reshape(1, -1)
+    rows, total_criteria = levels.shape
+
+    total_risk_score = levels.sum(axis=1, dtype=np.int64)
+    average_index = total_risk_score / total_criteria
+    # int() truncation of a non-negative average is a floor, which astype() reproduces
+    overall_index = average_index.astype(np.uint8)
+
+    return RiskScores(average_index, overall_index, level_counts(levels))
+
+
+def level_counts(levels):
+    """(N, 4) number of criteria at each risk level, per row of an option-index matrix."""
+    rows = len(levels)
+    # Count every (row, level) pair at once by offsetting each row into its own block of bins
+    level_count = len(risk_levels)
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * level_count
+    return np.bincount((levels + offsets).ravel(), minlength=rows * level_count).reshape(rows, level_count)
+
+
+def score_store(store, model=None):
+    """Score every supplier in a SupplierStore, returned as a DataFrame indexed by name."""
+    return (model or default_model).score_store(store).to_frame(names=store.names)
+
+
+AGGREGATIONS = ("mean", "max", "percentile")
+
+# Today's rule: unweighted average option index, truncated
+DEFAULT_MODEL = {"name": "Unweighted average", "aggregation": "mean"}
+
+
+def _resolve(names, lookup, what, model_name):
+    resolved = {}
+    for name, value in names.items():
+        if name not in lookup:
+            raise ValueError(f"Scoring model {model_name!r}: unknown {what} {name!r}")
+        resolved[lookup[name]] = value
+    return resolved
+
+
+def _level_index(level, model_name):
+    if level not in risk_levels:
+        raise ValueError(f"Scoring model {model_name!r}: unknown risk level {level!r}, expected one of {risk_levels}")
+    return risk_levels.index(level)
+
+
+class ScoringModel:
+    """A compiled scoring model: per-criterion weights, knockout tables and an aggregation."""
+
+    def __init__(self, definition):
+        self.definition = definition
+        self.name = definition.get("name", "Custom model")
+        self.aggregation = definition.get("aggregation", "mean")
+        if self.aggregation not in AGGREGATIONS:
+            raise ValueError(f"Scoring model {self.name!r}: unknown aggregation {self.aggregation!r}, "
+                             f"expected one of {AGGREGATIONS}")
+        self.percentile = float(definition.get("percentile", 50))
+        if not 0 < self.percentile <= 100:
+            raise ValueError(f"Scoring model {self.name!r}: percentile must be in (0, 100]")
+
+        category_lookup = {}
+        for cat_name in categories:
+            category_lookup[cat_name] = category_lookup[cat_name.replace("️⃣", "").strip()] = cat_name
+        criterion_lookup = {crit.key: crit.id for crit in criteria_table}
+        criterion_lookup.update({crit.name: crit.id for crit in criteria_table})
+
+        category_weights = _resolve(definition.get("category_weights", {}), category_lookup, "category", self.name)
+        criterion_weights = _resolve(definition.get("criterion_weights", {}), criterion_lookup, "criterion", self.name)
+        self.weights = np.array([category_weights.get(crit.category, 1.0) * criterion_weights.get(crit.id, 1.0)
+                                 for crit in criteria_table], dtype=np.float64)
+        if (self.weights < 0).any() or not self.weights.sum() > 0:
+            raise ValueError(f"Scoring model {self.name!r}: weights must be non-negative and not all zero")
+        self.total_weight = self.weights.sum()
+        self.active = np.flatnonzero(self.weights)
+
+        # (criterion id, 4-entry "triggers at this level" table, forced level index)
+        self.knockouts = []
+        for rule in definition.get("knockouts", []):
+            if not isinstance(rule, dict) or rule.get("criterion") is None:
+                raise ValueError(f"Scoring model {self.name!r}: knockout rule {rule!r} needs a \"criterion\"")
+            criterion_id = _resolve({rule["criterion"]: None}, criterion_lookup, "criterion", self.name)
+            triggers = np.zeros(len(risk_levels), dtype=bool)
+            triggers[[_level_index(level, self.name) for level in rule.get("when", ["Critical"])]] = True
+            self.knockouts.append((next(iter(criterion_id)), triggers,
+                                   _level_index(rule.get("force", "Critical"), self.name)))
+
+        # Equal weights, mean and no knockouts is the original rule: AssessmentState keeps
+        # scoring it incrementally and score() takes the integer-sum path of score_levels
+        self.is_unweighted_mean = (self.aggregation == "mean" and not self.knockouts
+                                   and (self.weights == self.weights[0]).all())
+
+    @property
+    def version(self):
+        """Hash of the definition, used to key caches of scores computed with this model."""
+        text = json.dumps(self.definition, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def _weighted_average(self, levels):
+        if self.is_unweighted_mean:
+            return levels.sum(axis=1, dtype=np.int64) / levels.shape[1]
+        # Column by column, so no float copy of the whole matrix is made
+        total = np.zeros(len(levels))
+        for criterion_id in self.active:
+            total += self.weights[criterion_id] * levels[:, criterion_id]
+        return total / self.total_weight
+
+    def _weighted_level_shares(self, levels):
+        # (N, 4) share of the total weight at each level
+        shares = np.zeros((len(levels), len(risk_levels)))
+        rows = np.arange(len(levels))
+        for criterion_id in self.active:
+            shares[rows, levels[:, criterion_id]] += self.weights[criterion_id]
+        return shares / self.total_weight
+
+    def score(self, levels):
+        """Score an (N, criteria) matrix of option indexes; returns RiskScores."""
+        levels = np.asarray(levels, dtype=np.uint8)
+        if levels.ndim == 1:
+            levels = levels.reshape(1, -1)
+
+        average_index = self._weighted_average(levels)
+        if self.aggregation == "mean":
+            # int() truncation of a non-negative average is a floor, which astype() reproduces
+            overall_index = average_index.astype(np.uint8)
+        elif self.aggregation == "max":
+            # Most severe = lowest option index
+            overall_index = levels[:, self.active].min(axis=1)
+        else:
+            cumulative = np.cumsum(self._weighted_level_shares(levels), axis=1)
+            # First level, from Critical down, whose cumulative share reaches the percentile
+            overall_index = (cumulative < self.percentile / 100 - 1e-12).sum(axis=1).astype(np.uint8)
+
+        for criterion_id, triggers, forced in self.knockouts:
+            hit = triggers[levels[:, criterion_id]]
+            overall_index = np.where(hit, np.minimum(overall_index, forced), overall_index).astype(np.uint8)
+
+        return RiskScores(average_index, overall_index, level_counts(levels))
+
+    def score_distinct(self, levels):
+        """Like score(), but each distinct profile is scored once and the scores shared."""
+        profiles, profile_ids = intern_levels(levels)
+        return self.score(profiles).take(profile_ids)
+
+    def score_store(self, store):
+        """Scores of every supplier in a SupplierStore, computed once per distinct profile."""
+        return self.score(store.profiles).take(store.profile_ids)
+
+
+def compile_model(definition=None):
+    """Compile a scoring model definition (DEFAULT_MODEL if None)."""
+    return ScoringModel(DEFAULT_MODEL if definition is None else definition)
+
+
+def load_model(path):
+    """Compile the scoring model defined in a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        return compile_model(json.load(f))
+
+
+default_model = compile_model()
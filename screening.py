@@ -0,0 +1,492 @@
+# screening.py
+# Sanctions / watch-list screening of supplier names
+#
+# Names on both sides are normalised the same way: accents and case folded, punctuation
+# dropped, legal forms ("Ltd", "GmbH", "S.A." ...) and stopwords removed, tokens sorted. Every
+# list entry is indexed under its name and each of its aliases.
+#
+# Candidates come from token blocking instead of comparing every supplier with every entry.
+# An alias is indexed under these keys:
+#   - its whole normalised name
+#   - each token, and each pair of tokens
+#   - the 4-letter prefix and suffix of each long token, so a word with one typo still
+#     shares a key
+# The postings are one CSR-style array, as in name_search.py. Keys shared by more than
+# MAX_BLOCK aliases ("bank", "trading") are too common to narrow anything and are skipped.
+# A name made only of common words is still found through its token pairs or its whole name.
+# Names are scored in two ways:
+#   - token-sort similarity: difflib ratio of the sorted, joined tokens. The character counts
+#     of every alias are kept in one array, so difflib's quick_ratio upper bound is computed
+#     for all the candidates of a name at once and only those that pass are compared. A typo
+#     can move a token in the sort order, so names sharing some tokens are also compared
+#     with the shared tokens first and the others after them
+#   - containment: every token of one name appears in the other ("Rosneft" in "Rosneft
+#     Trading"). This counts as CONTAINED_SCORE when the names share a rare token (and share
+#     two or more tokens or that token is long): common words alone ("Global Trading") say
+#     too little. One shared rare word is not enough either when the entry has more to its
+#     name ("Noranloyo" is not "Noranloyo Quibello Ananan"): the names must share two rare
+#     tokens, or the shared tokens must make up most of the entry's name (CONTAINED_COVERAGE
+#     of its characters) and the supplier's other words must be common in the list (used by
+#     more than COMMON_TOKEN_DF aliases). Only aliases sharing a rare token are checked
+# A supplier is a hit when some alias reaches the threshold (SCREENING_THRESHOLD by default).
+# The app then suggests the Critical "Country risk" option, "Sanctioned / unstable".
+#
+# Re-screening is incremental (ScreeningState, an SQLite file). Each entry is stored with a
+# digest. When the list is updated, hits on removed or changed entries are dropped. Suppliers
+# already screened are matched only against an index of the added or changed entries, and
+# only new suppliers are matched against the whole list. Whether an unchanged entry is a
+# candidate also depends on the whole list (which keys are too common to block on, which
+# tokens are rare or common), so the state keeps these and the entries under a key or token
+# that changed status are screened again too, as are the suppliers with such a token in their
+# name (containment looks at the supplier's other words). The result is the same as screening
+# everything again.
+#
+# List files: CSV with columns id, name, aliases (separated by ";") and optional details
+# columns, or JSONL records {"id", "name", "aliases": [...], ...}.
+#
+# Usage:
+#   python screening.py screen sanctions.csv [--source vendors.jsonl] [--state screening.sqlite] [-o hits.csv]
+#   python screening.py check sanctions.csv "Supplier name"
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from criteria import COUNTRY_RISK
+
+SCREENING_THRESHOLD = 0.88
+CONTAINED_SCORE = 0.9
+# Share of an entry name's characters that tokens shared with one rare token must make up
+CONTAINED_COVERAGE = 2 / 3
+# Aliases per blocking key above which the key is considered too common to block on
+MAX_BLOCK = 500
+# A name counts as contained only if one of its tokens is used by at most RARE_TOKEN_DF aliases
+RARE_TOKEN_DF = 3
+# Words used by more than COMMON_TOKEN_DF aliases ("Trading", "Global") are common
+COMMON_TOKEN_DF = 20
+_PREFIX = 4
+
+# Option suggested for a supplier with a hit
+SANCTIONED_OPTION = COUNTRY_RISK.options[0]
+
+_LEGAL_FORMS = frozenset(
+    "ab ag as bv co company corp corporation gmbh inc incorporated jsc kg kk limited llc llp ltd nv "
+    "ojsc oy plc pjsc pte pty sa sarl sas spa srl".split())
+_STOPWORDS = frozenset("a an and de del der des di du el et for la le les of the und y".split())
+_WORD = re.compile(r"[^\W_]+")
+# Characters are counted in this many buckets (code point modulo), a-z and space apart
+_CHAR_BUCKETS = 32
+
+WatchEntry = namedtuple("WatchEntry", ["id", "name", "aliases", "details"])
+ScreeningHit = namedtuple("ScreeningHit", ["entry_id", "name", "alias", "score"])
+
+
+def normalise_name(name):
+    """Comparable tokens of a name: folded, without punctuation, legal forms or stopwords."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    # "S.A." and "A/S" become "sa" and "as" before tokenising
+    text = re.sub(r"\b(\w)[./](\w)\b\.?", r"\1\2", text)
+    tokens = _WORD.findall(text)
+    kept = [token for token in tokens if token not in _LEGAL_FORMS and token not in _STOPWORDS]
+    return tuple(sorted(kept or tokens))
+
+
+def blocking_keys(tokens):
+    keys = {"=" + " ".join(tokens)}
+    keys.update(tokens)
+    keys.update(f"{a} {b}" for i, a in enumerate(tokens) for b in tokens[i + 1:])
+    for token in tokens:
+        if len(token) > _PREFIX + 1:
+            keys.add(token[:_PREFIX] + "*")
+            keys.add("*" + token[-_PREFIX:])
+    return keys
+
+
+def _aligned_ratio(tokens, other):
+    # difflib ratio with the tokens both names share first, then the rest of each, sorted
+    shared = set(tokens) & set(other)
+    if not shared:
+        return 0.0
+    common = sorted(shared)
+    a = " ".join(common + [token for token in tokens if token not in shared])
+    b = " ".join(common + [token for token in other if token not in shared])
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def char_counts(texts):
+    """(N, _CHAR_BUCKETS) uint8 character counts of strings, for difflib's quick_ratio bound."""
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32) % _CHAR_BUCKETS
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    counts = np.bincount(rows * _CHAR_BUCKETS + codes, minlength=len(texts) * _CHAR_BUCKETS)
+    return np.minimum(counts, 255).astype(np.uint8).reshape(len(texts), _CHAR_BUCKETS)
+
+
+def _csv_records(f, path):
+    # (line number, record) of the CSV rows; a row with more or fewer cells than the header
+    # would shift or lose columns
+    reader = csv.reader(f)
+    header = next(reader, [])
+    for values in reader:
+        if not values:
+            continue
+        if len(values) != len(header):
+            raise ValueError(f"{path}:{reader.line_num}: {len(values)} cells, the header has {len(header)}")
+        yield reader.line_num, dict(zip(header, values))
+
+
+def read_watch_list(path):
+    """[WatchEntry] from a CSV or JSONL list file."""
+    entries = []
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            records = ((line_no, json.loads(line)) for line_no, line in enumerate(f, start=1) if line.strip())
+        else:
+            records = _csv_records(f, path)
+        for line_no, record in records:
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_no}: expected a JSON object")
+            aliases = record.pop("aliases", None) or []
+            if isinstance(aliases, str):
+                aliases = [alias.strip() for alias in aliases.split(";") if alias.strip()]
+            name = record.pop("name", None)
+            if not name:
+                raise ValueError(f"{path}:{line_no}: entry without a name")
+            entry_id = str(record.pop("id", None) or name)
+            entries.append(WatchEntry(entry_id, name, tuple(aliases), record))
+    return entries
+
+
+def entry_digest(entry):
+    return hashlib.blake2b(json.dumps([entry.name, entry.aliases, entry.details], sort_keys=True).encode(),
+                           digest_size=16).digest()
+
+
+class WatchList:
+    """Blocking index over the names and aliases of watch-list entries."""
+
+    def __init__(self, entries, max_block=MAX_BLOCK, reference=None):
+        # With a `reference` list (the whole list, when `entries` are only its new entries), block
+        # sizes and token frequencies are taken from it so both give the same candidates
+        self.entries = list(entries)
+        self.max_block = max_block
+        self.reference = reference
+        self.alias_names = []
+        self.alias_tokens = []
+        self.alias_text = []
+        alias_entry = array("i")
+        for entry_row, entry in enumerate(self.entries):
+            seen = set()
+            for alias in (entry.name, *entry.aliases):
+                tokens = normalise_name(alias)
+                if tokens and tokens not in seen:
+                    seen.add(tokens)
+                    self.alias_names.append(alias)
+                    self.alias_tokens.append(tokens)
+                    self.alias_text.append(" ".join(tokens))
+                    alias_entry.append(entry_row)
+        self.alias_entry = np.frombuffer(alias_entry, dtype=np.int32)
+        self.alias_length = np.array([len(text) for text in self.alias_text], dtype=np.int32)
+        self.alias_chars = char_counts(self.alias_text)
+        if reference is None:
+            self.token_df = Counter(token for tokens in self.alias_tokens for token in set(tokens))
+        else:
+            self.token_df = reference.token_df
+
+        # Postings of every blocking key, one CSR-style array
+        self._key_ids = {}
+        key_buf = array("i")
+        alias_buf = array("i")
+        for alias_row, tokens in enumerate(self.alias_tokens):
+            for key in blocking_keys(tokens):
+                key_buf.append(self._key_ids.setdefault(key, len(self._key_ids)))
+                alias_buf.append(alias_row)
+        key_column = np.frombuffer(key_buf, dtype=np.int32)
+        order = np.argsort(key_column, kind="stable")
+        self._postings = np.frombuffer(alias_buf, dtype=np.int32)[order]
+        self._offsets = np.searchsorted(key_column[order], np.arange(len(self._key_ids) + 1))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def block_size(self, key):
+        """Number of aliases indexed under a blocking key."""
+        key_id = self._key_ids.get(key)
+        return 0 if key_id is None else int(self._offsets[key_id + 1] - self._offsets[key_id])
+
+    def blocked_keys(self):
+        """Keys skipped as too common (more than max_block aliases); the whole-name key never is."""
+        sizes = np.diff(self._offsets)
+        keys = list(self._key_ids)
+        return {keys[key_id] for key_id in np.flatnonzero(sizes > self.max_block).tolist() if keys[key_id][0] != "="}
+
+    def entries_under(self, keys):
+        """Rows of the entries with an alias indexed under any of `keys`."""
+        rows = [self._postings[self._offsets[key_id]:self._offsets[key_id + 1]]
+                for key_id in (self._key_ids.get(key) for key in keys) if key_id is not None]
+        return np.unique(self.alias_entry[np.concatenate(rows)]).tolist() if rows else []
+
+    def _candidates(self, tokens, text, threshold):
+        # (aliases that may reach `threshold` by ratio, aliases sharing a rare token)
+        postings = []
+        rare = []
+        for key in blocking_keys(tokens):
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                continue
+            start, end = self._offsets[key_id], self._offsets[key_id + 1]
+            size = end - start if self.reference is None else self.reference.block_size(key)
+            # The whole-name key is always used: it holds exact matches only
+            if size <= self.max_block or key[0] == "=":
+                postings.append(self._postings[start:end])
+                if key in tokens and self.token_df[key] <= RARE_TOKEN_DF:
+                    rare.append(self._postings[start:end])
+        if not postings:
+            return [], []
+        candidates = np.unique(np.concatenate(postings))
+        # difflib's quick_ratio: 2 * (characters in common) / (len + len), an upper bound of ratio
+        common = np.minimum(self.alias_chars[candidates], char_counts([text])[0]).sum(axis=1, dtype=np.int32)
+        candidates = candidates[2 * common >= threshold * (self.alias_length[candidates] + len(text))]
+        contained = np.unique(np.concatenate(rare)).tolist() if rare else []
+        return candidates.tolist(), contained
+
+    def _contained(self, alias_tokens, tokens):
+        alias_set, name_set = set(alias_tokens), set(tokens)
+        shared = alias_set & name_set
+        if shared != alias_set and shared != name_set:
+            return False
+        # Common words alone ("Global Trading") say too little about who a supplier is
+        rare = sum(1 for token in shared if self.token_df[token] <= RARE_TOKEN_DF and (len(shared) >= 2 or len(token) >= 5))
+        if rare != 1:
+            return rare > 1
+        # The rest of the supplier's name must be common words: "Rosneft Trading" is Rosneft,
+        # "Gratrilinbel Vobelmarfen" is another company that happens to share a word
+        return (sum(map(len, shared)) > CONTAINED_COVERAGE * sum(map(len, alias_set))
+                and all(self.token_df[token] > COMMON_TOKEN_DF for token in name_set - shared))
+
+    def screen_tokens(self, tokens, threshold=SCREENING_THRESHOLD):
+        """[ScreeningHit] for normalised name tokens, best alias per entry, best first."""
+        if not tokens:
+            return []
+        text = " ".join(tokens)
+        best = {}
+
+        def consider(alias_row, score):
+            if score >= threshold:
+                entry_row = int(self.alias_entry[alias_row])
+                if score > best.get(entry_row, (0.0,))[0]:
+                    best[entry_row] = (score, alias_row)
+
+        similar, contained = self._candidates(tokens, text, threshold)
+        matcher = None
+        for alias_row in similar:
+            if self.alias_tokens[alias_row] == tokens:
+                consider(alias_row, 1.0)
+            else:
+                if matcher is None:
+                    # The query is difflib's second sequence: its character index is built once
+                    matcher = SequenceMatcher(None, "", text, autojunk=False)
+                matcher.set_seq1(self.alias_text[alias_row])
+                score = matcher.ratio()
+                if score < threshold:
+                    score = _aligned_ratio(tokens, self.alias_tokens[alias_row])
+                consider(alias_row, score)
+        for alias_row in contained:
+            if self._contained(self.alias_tokens[alias_row], tokens):
+                consider(alias_row, CONTAINED_SCORE)
+        hits = [ScreeningHit(self.entries[entry_row].id, self.entries[entry_row].name, self.alias_names[alias_row],
+                             round(score, 3))
+                for entry_row, (score, alias_row) in best.items()]
+        return sorted(hits, key=lambda hit: (-hit.score, hit.entry_id))
+
+    def screen(self, name, threshold=SCREENING_THRESHOLD):
+        """[ScreeningHit] for a supplier name."""
+        return self.screen_tokens(normalise_name(name), threshold)
+
+    def screen_names(self, names, threshold=SCREENING_THRESHOLD):
+        """{name: [ScreeningHit]} for the names with at least one hit."""
+        # Names that normalise alike ("Acme Ltd", "ACME") are screened once
+        by_tokens = {}
+        for name in names:
+            by_tokens.setdefault(normalise_name(name), []).append(name)
+        results = {}
+        for tokens, same in by_tokens.items():
+            hits = self.screen_tokens(tokens, threshold)
+            if hits:
+                for name in same:
+                    results[name] = hits
+        return results
+
+
+_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS screening_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS list_entries (entry_id TEXT PRIMARY KEY, digest BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS screened (name TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS token_classes (token TEXT PRIMARY KEY, class INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS blocked_keys (key TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS hits (
+    name TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    entry_name TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (name, entry_id)
+);
+CREATE INDEX IF NOT EXISTS hits_entry ON hits (entry_id);
+"""
+
+
+class ScreeningState:
+    """Screening results and the list version they were computed against, in an SQLite file."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_STATE_SCHEMA)
+
+    def hits(self, name=None):
+        """{supplier name: [ScreeningHit]} of the stored hits (of one supplier)."""
+        sql = "SELECT name, entry_id, entry_name, alias, score FROM hits"
+        rows = self.conn.execute(sql + " WHERE name = ?", (name,)) if name else self.conn.execute(sql + " ORDER BY name")
+        results = {}
+        for row in rows:
+            results.setdefault(row[0], []).append(ScreeningHit(*row[1:]))
+        return results
+
+    def rescreen(self, names, entries, threshold=SCREENING_THRESHOLD, max_block=MAX_BLOCK):
+        """Bring the stored results up to date with `names` and `entries`; returns a stats dict."""
+        conn = self.conn
+        stats = {"suppliers": len(names), "entries": len(entries)}
+        info = dict(conn.execute("SELECT key, value FROM screening_info"))
+        settings = {"threshold": repr(threshold), "max_block": repr(max_block)}
+        if any(info.get(key) != value for key, value in settings.items()):
+            # Different settings invalidate every stored result
+            with conn:
+                for table in ("list_entries", "screened", "token_classes", "blocked_keys", "hits"):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT OR REPLACE INTO screening_info VALUES (?, ?)", settings.items())
+
+        watch_list = WatchList(entries, max_block)
+        digests = {entry.id: entry_digest(entry) for entry in entries}
+        previous = dict(conn.execute("SELECT entry_id, digest FROM list_entries"))
+        # An unchanged entry can gain or lose candidates when a token becomes rare (or stops
+        # being rare) or a key crosses max_block: its entries are screened again too. Tokens
+        # that are not rare are kept (class 1, or 2 when common) rather than rare ones, as a
+        # token that leaves the list becomes rare
+        classes = {token: 1 + (df > COMMON_TOKEN_DF) for token, df in watch_list.token_df.items() if df > RARE_TOKEN_DF}
+        previous_classes = dict(conn.execute("SELECT token, class FROM token_classes"))
+        flipped = classes.keys() ^ previous_classes.keys()
+        changed = {token for token in classes.keys() | previous_classes.keys()
+                   if classes.get(token) != previous_classes.get(token)}
+        blocked = watch_list.blocked_keys()
+        previous_blocked = {row[0] for row in conn.execute("SELECT key FROM blocked_keys")}
+        rescored = {watch_list.entries[entry_row].id
+                    for entry_row in watch_list.entries_under(flipped | (blocked ^ previous_blocked))}
+        stale = [entry_id for entry_id, digest in previous.items()
+                 if digests.get(entry_id) != digest or entry_id in rescored]
+        fresh = [entry for entry in entries if previous.get(entry.id) != digests[entry.id] or entry.id in rescored]
+        screened = {row[0] for row in conn.execute("SELECT name FROM screened")}
+        current = set(names)
+        known = [name for name in names if name in screened]
+        new = [name for name in names if name not in screened]
+        gone = [name for name in screened if name not in current]
+        # Suppliers with a word that changed class are screened from scratch
+        redo = {name for name in known if not changed.isdisjoint(normalise_name(name))} if changed else set()
+        known = [name for name in known if name not in redo]
+        stats.update(stale_entries=len(stale), fresh_entries=len(fresh), new_suppliers=len(new),
+                     rescreened_suppliers=len(redo))
+
+        found = {}
+        start = time.perf_counter()
+        if fresh and known:
+            found.update(WatchList(fresh, max_block, reference=watch_list).screen_names(known, threshold))
+        if new or redo:
+            found.update(watch_list.screen_names(new + sorted(redo), threshold))
+        stats["screen_seconds"] = round(time.perf_counter() - start, 3)
+
+        with conn:
+            conn.executemany("DELETE FROM hits WHERE entry_id = ?", ((entry_id,) for entry_id in stale))
+            conn.executemany("DELETE FROM hits WHERE name = ?", ((name,) for name in [*gone, *redo]))
+            conn.executemany("DELETE FROM screened WHERE name = ?", ((name,) for name in gone))
+            conn.executemany("INSERT OR REPLACE INTO hits VALUES (?, ?, ?, ?, ?)",
+                             ((name, *hit) for name, hits in found.items() for hit in hits))
+            conn.executemany("INSERT INTO screened VALUES (?)", ((name,) for name in new))
+            conn.executemany("DELETE FROM list_entries WHERE entry_id = ?",
+                             ((entry_id,) for entry_id in stale if entry_id not in digests))
+            conn.executemany("INSERT OR REPLACE INTO list_entries VALUES (?, ?)",
+                             ((entry.id, digests[entry.id]) for entry in fresh))
+            conn.executemany("DELETE FROM token_classes WHERE token = ?",
+                             ((token,) for token in previous_classes.keys() - classes.keys()))
+            conn.executemany("INSERT OR REPLACE INTO token_classes VALUES (?, ?)",
+                             ((token, classes[token]) for token in changed if token in classes))
+            conn.executemany("DELETE FROM blocked_keys WHERE key = ?", ((key,) for key in previous_blocked - blocked))
+            conn.executemany("INSERT INTO blocked_keys VALUES (?)", ((key,) for key in blocked - previous_blocked))
+        stats["suppliers_with_hits"] = conn.execute("SELECT COUNT(DISTINCT name) FROM hits").fetchone()[0]
+        return stats
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen supplier names against a sanctions / watch list")
+    commands = parser.add_subparsers(dest="command", required=True)
+    screen = commands.add_parser("screen", help="Screen a supplier source (incrementally with --state)")
+    screen.add_argument("list", help="Watch list (CSV or JSONL)")
+    screen.add_argument("--source", help="JSONL records or a .cat catalogue file (default: the bundled suppliers_data)")
+    screen.add_argument("--state", help="SQLite file keeping results between runs (default: screen from scratch)")
+    screen.add_argument("--threshold", type=float, default=SCREENING_THRESHOLD)
+    screen.add_argument("-o", "--output", help="CSV of hits (default: stdout)")
+    check = commands.add_parser("check", help="Screen one name")
+    check.add_argument("list")
+    check.add_argument("name")
+    check.add_argument("--threshold", type=float, default=SCREENING_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        entries = read_watch_list(args.list)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.command == "check":
+        for hit in WatchList(entries).screen(args.name, args.threshold):
+            print(f"{hit.score:.3f}  {hit.entry_id}  {hit.name} (as {hit.alias})")
+        return 0
+
+    from catalogue_file import load_source_store
+
+    names = load_source_store(args.source).names
+    state = ScreeningState(args.state or ":memory:")
+    try:
+        stats = state.rescreen(names, entries, args.threshold)
+        results = state.hits()
+    finally:
+        state.close()
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["supplier", "entry_id", "entry_name", "alias", "score"])
+        for name, hits in results.items():
+            for hit in hits:
+                writer.writerow([name, *hit])
+    finally:
+        if args.output:
+            out.close()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
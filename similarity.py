@@ -0,0 +1,94 @@
+# similarity.py
+# Nearest-neighbour search over supplier risk profiles
+#
+# Profiles are compared by their 28 option indexes, with L1 distance (sum of per-criterion
+# index differences, 0-84) or Hamming distance (number of criteria that differ). The index
+# works on the store's distinct profiles (SupplierStore.profiles), each packed into bit
+# vectors so that one distance is a popcount of an XOR:
+#   - L1: thermometer code, index v sets the first v of 3 bits, |a - b| = popcount(a ^ b)
+#   - Hamming: one-hot code, 4 bits per criterion, 2 x differing = popcount(a ^ b)
+# A query XORs the packed matrix once, counts bits, and picks the distance threshold that
+# holds k suppliers from a histogram of the distances, so no full sort is needed.
+
+import numpy as np
+
+METRICS = ("l1", "hamming")
+_WORD_BITS = 64
+
+
+def _popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    # NumPy < 2.0: per-byte lookup table
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def pack_profiles(levels, metric="l1", option_count=4):
+    """(words, N) uint64 bit vectors of an option-index matrix for `metric`.
+
+    Word-major, so each word of every profile is one contiguous array for the XOR kernel.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}, expected one of {METRICS}")
+    levels = np.asarray(levels, dtype=np.uint8)
+    if levels.ndim == 1:
+        levels = levels.reshape(1, -1)
+    bits_per_criterion = option_count - 1 if metric == "l1" else option_count
+    total_bits = levels.shape[1] * bits_per_criterion
+    packed = np.zeros((-(-total_bits // _WORD_BITS), len(levels)), dtype=np.uint64)
+    for criterion_id in range(levels.shape[1]):
+        column = levels[:, criterion_id]
+        for bit in range(bits_per_criterion):
+            # Thermometer: bit t is set when the index is above t; one-hot: when it equals t
+            is_set = column > bit if metric == "l1" else column == bit
+            position = criterion_id * bits_per_criterion + bit
+            word, shift = divmod(position, _WORD_BITS)
+            packed[word] |= is_set.astype(np.uint64) << np.uint64(shift)
+    return packed
+
+
+class ProfileSimilarityIndex:
+    """Top-k most similar suppliers to a profile, over a SupplierStore's distinct profiles."""
+
+    def __init__(self, store, metric="l1"):
+        self.metric = metric
+        self.names = store.names
+        self.packed = pack_profiles(store.profiles, metric)
+        # Suppliers grouped by profile (CSR): members of profile p are rows[offsets[p]:offsets[p + 1]]
+        profile_ids = store.profile_ids
+        self.rows = np.argsort(profile_ids, kind="stable").astype(np.uint32)
+        self.group_sizes = np.bincount(profile_ids, minlength=self.packed.shape[1])
+        self.shared = len(profile_ids) > self.packed.shape[1]
+        self.offsets = np.concatenate(([0], np.cumsum(self.group_sizes)))
+
+    def distances(self, levels):
+        """Distance from a profile (option indexes) to every distinct profile."""
+        query = pack_profiles(levels, self.metric)[:, 0]
+        distance = np.zeros(self.packed.shape[1], dtype=np.uint8)
+        for word, query_word in zip(self.packed, query):
+            distance += _popcount(word ^ query_word)
+        return distance // 2 if self.metric == "hamming" else distance
+
+    def nearest(self, levels, k=5, exclude=None):
+        """[(row, distance)] of the k closest suppliers, closest first, ties by catalogue order."""
+        if not len(self.names) or k <= 0:
+            return []
+        distance = self.distances(levels)
+        wanted = k + (exclude is not None)
+        # Smallest threshold such that the profiles within it hold `wanted` suppliers
+        per_distance = np.bincount(distance, weights=self.group_sizes if self.shared else None)
+        threshold = min(int(np.searchsorted(np.cumsum(per_distance), wanted)), len(per_distance) - 1)
+        candidates = np.flatnonzero(distance <= threshold)
+
+        # Expand candidate profiles to their suppliers
+        sizes = self.group_sizes[candidates]
+        starts = self.offsets[candidates]
+        positions = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        rows = self.rows[positions]
+        row_distance = np.repeat(distance[candidates], sizes)
+        if exclude is not None:
+            keep = rows != exclude
+            rows, row_distance = rows[keep], row_distance[keep]
+        order = np.lexsort((rows, row_distance))[:k]
+        return list(zip(rows[order].tolist(), row_distance[order].tolist()))
@@ -0,0 +1,285 @@
+# sqlite_catalogue.py
+# SQLite-backed supplier catalogue with a thread-safe connection pool
+#
+# Filtering, facet counts and name search run as indexed queries: B-tree indexes on sector,
+# geography, size and the lowercased name, plus an FTS5 trigram index for substring and
+# typo-tolerant search when the SQLite build supports it. One pool of read-only connections
+# is shared by every Streamlit session of the process.
+#
+# Usage:
+#   python sqlite_catalogue.py build catalogue.sqlite [--source vendors.jsonl | suppliers.cat]
+
+import argparse
+import difflib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from catalogue import SupplierCatalogue
+from catalogue_file import load_source_store
+from criteria import criteria_keys, criteria_table
+from metadata_index import ALL
+from similarity import ProfileSimilarityIndex
+from supplier_store import SupplierStore
+
+# Metadata fields stored as indexed columns
+METADATA_FIELDS = ("sector", "geography", "size")
+
+_SCHEMA = """
+CREATE TABLE catalogue_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE suppliers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    sector TEXT,
+    geography TEXT,
+    size TEXT,
+    levels BLOB NOT NULL
+);
+CREATE UNIQUE INDEX suppliers_name ON suppliers (name);
+CREATE INDEX suppliers_name_lower ON suppliers (name_lower);
+CREATE INDEX suppliers_sector ON suppliers (sector, geography);
+CREATE INDEX suppliers_geography ON suppliers (geography);
+CREATE INDEX suppliers_size ON suppliers (size);
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE suppliers_fts USING fts5(
+    name_lower, content='suppliers', content_rowid='id', tokenize='trigram'
+);
+INSERT INTO suppliers_fts (suppliers_fts) VALUES ('rebuild');
+"""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections that may be used from any thread."""
+
+    def __init__(self, path, size=8, timeout=30.0, readonly=True):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.readonly = readonly
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.readonly:
+            conn = sqlite3.connect(Path(self.path).absolute().as_uri() + "?mode=ro", uri=True,
+                                   check_same_thread=False, timeout=self.timeout)
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.timeout)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._connect()
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No SQLite connection available after {self.timeout}s") from None
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+def _quote(text):
+    # FTS5 string literal
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_sqlite_catalogue(store, path):
+    """Write a SupplierStore to a new SQLite catalogue at `path` (temp file + rename)."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        columns = {field: store.metadata_codes.get(field) for field in METADATA_FIELDS}
+
+        def rows():
+            for row, name in enumerate(store.names):
+                values = [None if column is None or column[row] < 0 else store.metadata_values[field][column[row]]
+                          for field, column in columns.items()]
+                yield [row, name, name.lower()] + values + [store.row_levels(row).tobytes()]
+
+        with conn:
+            conn.executemany("INSERT INTO suppliers VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                fts = "1"
+            except sqlite3.OperationalError:
+                # SQLite without FTS5/trigram: substring search falls back to a bounded scan
+                fts = "0"
+            conn.executemany("INSERT INTO catalogue_info VALUES (?, ?)", [
+                ("version", store.version), ("criteria", "\n".join(criteria_keys)), ("fts", fts),
+            ])
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+class SQLiteCatalogue(SupplierCatalogue):
+    """Catalogue served from an SQLite file through a shared connection pool."""
+
+    def __init__(self, path, pool_size=8):
+        self.pool = ConnectionPool(path, size=pool_size)
+        info = dict(self._query("SELECT key, value FROM catalogue_info"))
+        if info["criteria"].split("\n") != list(criteria_keys):
+            raise ValueError(f"{path}: criteria do not match the current framework, rebuild the catalogue")
+        self._version = info["version"]
+        self._fts = info.get("fts") == "1"
+        self._count = self._query("SELECT COUNT(*) FROM suppliers")[0][0]
+        self._similarity = None
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @property
+    def version(self):
+        return self._version
+
+    def __contains__(self, name):
+        return bool(self._query("SELECT 1 FROM suppliers WHERE name = ?", (name,)))
+
+    def __len__(self):
+        return self._count
+
+    def metadata(self, name):
+        rows = self._query(f"SELECT {', '.join(METADATA_FIELDS)} FROM suppliers WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        return {field: value for field, value in zip(METADATA_FIELDS, rows[0]) if value is not None}
+
+    def profile(self, name):
+        rows = self._query("SELECT levels FROM suppliers WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        return {crit.key: crit.options[idx] for crit, idx in zip(criteria_table, rows[0][0])}
+
+    def _check_field(self, field):
+        if field not in METADATA_FIELDS:
+            raise KeyError(f"Unknown metadata field {field!r}")
+
+    def facet_counts(self, field):
+        self._check_field(field)
+        return dict(self._query(f"SELECT {field}, COUNT(*) FROM suppliers WHERE {field} IS NOT NULL "
+                                f"GROUP BY {field} ORDER BY {field}"))
+
+    def filter(self, **filters):
+        clauses, params = [], []
+        for field, value in filters.items():
+            self._check_field(field)
+            if value is not None and value != ALL:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [name for name, in self._query(f"SELECT name FROM suppliers {where} ORDER BY id", params)]
+
+    def exact(self, query):
+        rows = self._query("SELECT name FROM suppliers WHERE name_lower = ? ORDER BY id LIMIT 1", (query.lower(),))
+        return rows[0][0] if rows else None
+
+    def _search(self, query, limit):
+        # Prefix matches through the name_lower index, then substring matches
+        matches = [name for name, in self._query(
+            "SELECT name FROM suppliers WHERE name_lower >= ? AND name_lower < ? ORDER BY name_lower LIMIT ?",
+            (query, query + "\U0010ffff", limit))]
+        if len(matches) < limit:
+            if self._fts and len(query) >= 3:
+                sql = ("SELECT s.name FROM suppliers_fts JOIN suppliers s ON s.id = suppliers_fts.rowid "
+                       "WHERE suppliers_fts MATCH ? ORDER BY s.id LIMIT ?")
+                params = (_quote(query), limit + len(matches))
+            else:
+                sql = "SELECT name FROM suppliers WHERE instr(name_lower, ?) > 0 ORDER BY id LIMIT ?"
+                params = (query, limit + len(matches))
+            matches += [name for name, in self._query(sql, params) if name not in matches]
+        return matches[:limit]
+
+    def _fuzzy(self, query, limit, min_similarity=0.5):
+        if not self._fts or len(query) < 3:
+            return []
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        rows = self._query(
+            "SELECT s.name, s.name_lower FROM suppliers_fts JOIN suppliers s ON s.id = suppliers_fts.rowid "
+            "WHERE suppliers_fts MATCH ? ORDER BY bm25(suppliers_fts) LIMIT ?",
+            (" OR ".join(map(_quote, sorted(grams))), limit * 5))
+        ranked = sorted((-difflib.SequenceMatcher(None, query, lower).ratio(), name) for name, lower in rows)
+        return [name for score, name in ranked if -score >= min_similarity][:limit]
+
+    def suggest(self, query, limit=10):
+        query = query.lower()
+        if not query:
+            return []
+        matches = self._search(query, limit)
+        if len(matches) < limit:
+            matches += [name for name in self._fuzzy(query.strip(), limit) if name not in matches][:limit - len(matches)]
+        return matches
+
+    def similar(self, levels, limit=5, exclude=None):
+        # SQLite has no index for profile distances: the profiles are read once into an
+        # in-memory similarity index on first use
+        if self._similarity is None:
+            store = self.to_store()
+            self._similarity = (store, ProfileSimilarityIndex(store))
+        store, index = self._similarity
+        matches = index.nearest(levels, limit, exclude=store.name_index.get(exclude))
+        return [(store.names[row], distance) for row, distance in matches]
+
+    def to_store(self):
+        rows = self._query(f"SELECT name, {', '.join(METADATA_FIELDS)}, levels FROM suppliers ORDER BY id")
+        levels = np.frombuffer(b"".join(row[-1] for row in rows), dtype=np.uint8).reshape(len(rows), len(criteria_keys))
+        metadata_values, metadata_codes = {}, {}
+        for i, field in enumerate(METADATA_FIELDS, start=1):
+            codes = {}
+            column = np.array([-1 if row[i] is None else codes.setdefault(row[i], len(codes)) for row in rows])
+            if codes:
+                metadata_values[field] = list(codes)
+                metadata_codes[field] = column.astype(np.int32)
+        return SupplierStore([row[0] for row in rows], levels, metadata_values, metadata_codes, version=self._version)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an SQLite supplier catalogue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a catalogue database")
+    build.add_argument("path")
+    build.add_argument("--source", help="JSONL records or a .cat catalogue file (default: the bundled suppliers_data)")
+    args = parser.parse_args(argv)
+
+    store = load_source_store(args.source)
+    build_sqlite_catalogue(store, args.path)
+    print(f"Wrote {len(store)} suppliers to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
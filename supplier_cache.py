@@ -0,0 +1,244 @@
+# supplier_cache.py
+# Streamlit caches for the supplier catalogue and the structures derived from it
+#
+# The catalogue backend is a cache_resource keyed on the source file's stat, so editing
+# suppliers_data.py (or rebuilding the catalogue named by TPRM_CATALOGUE) reloads it.
+# Derived data (filter options, filter results, search suggestions, scores) is keyed on the
+# catalogue's content version: when the data changes, the version changes and stale
+# entries are never served. Hit/miss counters are kept per cached function.
+
+import atexit
+import functools
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+
+import streamlit as st
+
+from catalogue import InMemoryCatalogue
+from catalogue_file import open_catalogue
+from scoring import default_model, load_model
+from sqlite_catalogue import SQLiteCatalogue
+from supplier_store import SupplierStore
+
+# Optional catalogue source: a memory-mapped .cat file (catalogue_file.py) or an SQLite
+# database (.sqlite/.sqlite3/.db, sqlite_catalogue.py). Defaults to suppliers_data.py
+CATALOGUE_PATH = os.environ.get("TPRM_CATALOGUE")
+SQLITE_POOL_SIZE = int(os.environ.get("TPRM_SQLITE_POOL_SIZE", "8"))
+# Optional JSON scoring model definition (see scoring.py); defaults to scoring.DEFAULT_MODEL
+SCORING_MODEL_PATH = os.environ.get("TPRM_SCORING_MODEL")
+# Where submitted assessments are recorded (assessment_history.py); TPRM_HISTORY=off disables it
+HISTORY_PATH = os.environ.get("TPRM_HISTORY",
+                              os.path.join(os.path.expanduser("~"), ".tprm", "assessment_history.sqlite"))
+# Optional enrichment configuration (enrichment.py): providers that pre-fill criteria
+ENRICHMENT_PATH = os.environ.get("TPRM_ENRICHMENT")
+# Optional sanctions / watch list (screening.py) that supplier names are screened against
+WATCH_LIST_PATH = os.environ.get("TPRM_WATCH_LIST")
+
+# Catalogue exports of this process. Writing an export removes the files of older dataset or
+# model versions, and the directory is removed when the process exits
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), f"tprm-export-{os.getpid()}")
+atexit.register(shutil.rmtree, EXPORT_DIR, ignore_errors=True)
+
+_stats_lock = threading.Lock()
+_calls = Counter()
+_misses = Counter()
+
+
+def _tracked(cache_decorator, **cache_options):
+    # Wrap a Streamlit-cached function so every call and every recomputation is counted
+    def decorate(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            with _stats_lock:
+                _misses[name] += 1
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(**cache_options)(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            with _stats_lock:
+                _calls[name] += 1
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+
+def cache_stats():
+    """Return {function name: {"hits": n, "misses": n}} for the cached functions."""
+    with _stats_lock:
+        return {name: {"hits": _calls[name] - _misses[name], "misses": _misses[name]} for name in _calls}
+
+
+def source_version():
+    # Cheap change detector for the catalogue source: a stat, without importing or hashing it
+    path = CATALOGUE_PATH or importlib.util.find_spec("suppliers_data").origin
+    stat = os.stat(path)
+    return f"{path}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def scoring_model_version():
+    # Same stat-based change detection for the scoring model file
+    if not SCORING_MODEL_PATH:
+        return "default"
+    stat = os.stat(SCORING_MODEL_PATH)
+    return f"{SCORING_MODEL_PATH}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def watch_list_version():
+    # Same stat-based change detection for the watch list file
+    if not WATCH_LIST_PATH:
+        return None
+    stat = os.stat(WATCH_LIST_PATH)
+    return f"{WATCH_LIST_PATH}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _is_sqlite(path):
+    return path.endswith((".sqlite", ".sqlite3", ".db"))
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_catalogue(source_version):
+    """The supplier catalogue backend, shared by every session of the process."""
+    if CATALOGUE_PATH and _is_sqlite(CATALOGUE_PATH):
+        return SQLiteCatalogue(CATALOGUE_PATH, pool_size=SQLITE_POOL_SIZE)
+    catalogue = InMemoryCatalogue(load_supplier_store(source_version))
+    # Build the name search index here, once per catalogue version, rather than on the first keystroke
+    catalogue.search_index
+    return catalogue
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_supplier_store(source_version):
+    """The whole catalogue as a SupplierStore (for batch scoring and analytics)."""
+    if CATALOGUE_PATH and _is_sqlite(CATALOGUE_PATH):
+        return load_catalogue(source_version).to_store()
+    if CATALOGUE_PATH:
+        # Only names and metadata are read here; profiles stay on disk until accessed
+        return open_catalogue(CATALOGUE_PATH)
+    from suppliers_data import suppliers_data as supplier_records
+    return SupplierStore.from_records(supplier_records)
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_scoring_model(model_version):
+    """The compiled scoring model used by every page, compiled once per model file version."""
+    return load_model(SCORING_MODEL_PATH) if SCORING_MODEL_PATH else default_model
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_assessment_history(path=HISTORY_PATH):
+    """The assessment history (None when disabled), with one writer thread per process."""
+    if path.lower() in ("", "0", "off", "false"):
+        return None
+    from assessment_history import AssessmentHistory
+    return AssessmentHistory(path)
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_enrichment_pipeline(path=ENRICHMENT_PATH):
+    """The enrichment pipeline (None when not configured); its TTL cache is shared by every session."""
+    if not path:
+        return None
+    from enrichment import load_pipeline
+    return load_pipeline(path)
+
+
+@_tracked(st.cache_resource, show_spinner=False)
+def load_watch_list(list_version):
+    """The screening index of the watch list (None when not configured), built once per list version."""
+    if not list_version:
+        return None
+    from screening import WatchList, read_watch_list
+    return WatchList(read_watch_list(WATCH_LIST_PATH))
+
+
+@_tracked(st.cache_data, show_spinner=False)
+def supplier_facets(_catalogue, version, fields=("sector", "geography")):
+    """Sorted distinct values and per-value supplier counts for each metadata field."""
+    return {field: _catalogue.facet_counts(field) for field in fields}
+
+
+@_tracked(st.cache_data, show_spinner=False, max_entries=256)
+def filter_suppliers(_catalogue, version, **filters):
+    """Names of suppliers matching field=value filters ("All" matches everything)."""
+    return _catalogue.filter(**filters)
+
+
+@_tracked(st.cache_data, show_spinner=False, max_entries=1024)
+def suggest_suppliers(_catalogue, version, query, limit):
+    """Ranked name suggestions for a search query."""
+    return _catalogue.suggest(query, limit)
+
+
+@_tracked(st.cache_data, show_spinner=False, max_entries=1024)
+def similar_suppliers(_catalogue, version, levels, limit, exclude=None):
+    """[(name, distance, metadata)] of the suppliers with the closest profiles to `levels` (bytes)."""
+    return [(name, distance, _catalogue.metadata(name))
+            for name, distance in _catalogue.similar(list(levels), limit, exclude=exclude)]
+
+
+@_tracked(st.cache_data, show_spinner=False, max_entries=1024)
+def screen_supplier(_watch_list, list_version, name):
+    """Watch-list hits (ScreeningHit) for a supplier name."""
+    return _watch_list.screen(name)
+
+
+# Scores depend on the scoring model as well: the compiled model is passed unhashed and keyed
+# by its version
+
+@_tracked(st.cache_resource, show_spinner=False)
+def supplier_scores(_store, version, _model=default_model, model_version=default_model.version):
+    """Batch scores (scoring.RiskScores) of every supplier in the catalogue."""
+    # Scored once per distinct profile, then shared by every supplier with that profile
+    return _model.score_store(_store)
+
+
+@_tracked(st.cache_data, show_spinner=False)
+def portfolio_summary(_store, version, _model=default_model, model_version=default_model.version):
+    """Portfolio aggregates for the dashboard page (see portfolio.py)."""
+    # Imported here so pandas is only loaded when the dashboard is opened
+    from portfolio import portfolio_aggregates
+    return portfolio_aggregates(_store, supplier_scores(_store, version, _model, model_version))
+
+
+@_tracked(st.cache_resource, show_spinner=False, max_entries=8)
+def _catalogue_export(_store, version, fmt, _model=default_model, model_version=default_model.version):
+    from export import EXPORT_FORMATS, export_store
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tag = hashlib.blake2b(f"{version}|{model_version}".encode(), digest_size=8).hexdigest()
+    for name in os.listdir(EXPORT_DIR):
+        # Exports still being written (.tmp) belong to another thread
+        if not name.startswith(tag) and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(EXPORT_DIR, name))
+            except FileNotFoundError:
+                pass
+    return export_store(_store, os.path.join(EXPORT_DIR, f"{tag}-supplier_risk{EXPORT_FORMATS[fmt][1]}"), fmt, _model)
+
+
+def catalogue_export(store, version, fmt, model=default_model, model_version=default_model.version):
+    """Path of the whole catalogue exported in `fmt` (see export.py), written once per version."""
+    path = _catalogue_export(store, version, fmt, model, model_version)
+    if not os.path.exists(path):
+        # Still cached, but removed by an export of another version since: write it again
+        _catalogue_export.clear(store, version, fmt, model, model_version)
+        path = _catalogue_export(store, version, fmt, model, model_version)
+    return path
+
+
+def clear_caches():
+    for cached in (load_catalogue, load_supplier_store, load_scoring_model, load_assessment_history,
+                   load_enrichment_pipeline, load_watch_list, supplier_facets, filter_suppliers,
+                   suggest_suppliers, similar_suppliers, screen_supplier, supplier_scores, portfolio_summary,
+                   _catalogue_export):
+        cached.clear()
@@ -0,0 +1,242 @@
+# supplier_store.py
+# Columnar, integer-encoded storage for supplier risk profiles and metadata
+#
+# Identical profiles are interned: the store can hold each distinct profile once, plus one
+# profile id per supplier, and derived data (scores, category averages) is computed per
+# distinct profile and gathered back by id. A profile is identified by its option indexes
+# packed into one integer (2 bits per criterion for 4 options, 56 bits for 28 criteria).
+
+import hashlib
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+from criteria import criteria_table, validate_profile
+
+
+def encode_profile(profile, name=None):
+    """Encode a {"{category}_{criterion}": option} profile as a uint8 row of option indexes."""
+    row = np.zeros(len(criteria_table), dtype=np.uint8)
+    # Missing criteria keep index 0, the same default the sidebar form uses
+    for crit in criteria_table:
+        option = profile.get(crit.key)
+        if option is None:
+            continue
+        try:
+            row[crit.id] = crit.option_index[option]
+        except KeyError:
+            raise ValueError(f"Supplier {name!r}: invalid option {option!r} for {crit.key!r}") from None
+    return row
+
+
+# Bits per criterion when packing a profile into an integer key
+_KEY_BITS = max(1, (max(len(crit.options) for crit in criteria_table) - 1).bit_length())
+
+
+def profile_keys(levels):
+    """One key per row of an option-index matrix; equal keys <=> identical profiles."""
+    levels = np.ascontiguousarray(levels, dtype=np.uint8)
+    if _KEY_BITS * levels.shape[1] > 64:
+        # Too many criteria to pack into 64 bits: compare the raw row bytes instead
+        return levels.view(np.dtype((np.void, levels.shape[1]))).ravel()
+    keys = np.zeros(len(levels), dtype=np.uint64)
+    for criterion_id in range(levels.shape[1]):
+        keys |= levels[:, criterion_id].astype(np.uint64) << np.uint64(criterion_id * _KEY_BITS)
+    return keys
+
+
+def intern_levels(levels):
+    """(profiles, profile_ids): the distinct rows of an option-index matrix and each row's id among them."""
+    _, first, inverse = np.unique(profile_keys(levels), return_index=True, return_inverse=True)
+    return np.asarray(levels[first], dtype=np.uint8), inverse.reshape(-1).astype(np.uint32)
+
+
+def _code_dtype(cardinality):
+    # Smallest signed integer type able to hold the codes, -1 is reserved for "missing"
+    for dtype in (np.int8, np.int16, np.int32):
+        if cardinality < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class SupplierView(Mapping):
+    """Read-only view of one supplier shaped like a `suppliers_data` entry."""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def _keys(self):
+        if self._store.has_metadata(self._row):
+            return ("metadata", "profile")
+        return ("profile",)
+
+    def __getitem__(self, key):
+        if key == "metadata" and self._store.has_metadata(self._row):
+            return MappingProxyType(self._store.metadata(self._row))
+        if key == "profile":
+            return MappingProxyType(self._store.profile(self._row))
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return f"SupplierView({self._store.names[self._row]!r})"
+
+
+class SupplierStore(Mapping):
+    """Supplier catalogue stored as a supplier x criterion uint8 matrix of option indexes.
+
+    Option indexes match `risk_levels` (0 = Critical ... 3 = Low). Profiles are held either as
+    the full matrix (`levels`) or interned (`profiles`, one row per distinct profile, and
+    `profile_ids`, one per supplier); each form is derived from the other on first use.
+    Metadata fields are kept as interned value lists plus one integer code column per field.
+    The store behaves like a read-only `suppliers_data` dict: `store[name]["metadata"]`,
+    `store[name]["profile"]`.
+    """
+
+    def __init__(self, names, levels, metadata_values, metadata_codes, version=None, profile_ids=None):
+        # With profile_ids, `levels` holds the distinct profiles that profile_ids point into
+        self.names = names
+        self.name_index = {name: row for row, name in enumerate(names)}
+        if profile_ids is None:
+            self._levels, self._profiles, self._profile_ids = levels, None, None
+        else:
+            self._levels, self._profiles, self._profile_ids = None, levels, profile_ids
+        self.metadata_values = metadata_values
+        self.metadata_codes = metadata_codes
+        self._version = version
+
+    @property
+    def levels(self):
+        """(N, criteria) option-index matrix; built from the interned profiles if needed."""
+        if self._levels is None:
+            self._levels = self._profiles[self._profile_ids]
+        return self._levels
+
+    def _intern(self):
+        if self._profiles is None:
+            self._profiles, self._profile_ids = intern_levels(self._levels)
+
+    @property
+    def profiles(self):
+        """(distinct profiles, criteria) option-index matrix."""
+        self._intern()
+        return self._profiles
+
+    @property
+    def profile_ids(self):
+        """Row of `profiles` holding each supplier's profile."""
+        self._intern()
+        return self._profile_ids
+
+    def level_chunks(self, chunk_rows=65536):
+        """The option-index matrix in row chunks, without materialising an interned store."""
+        for start in range(0, len(self.names), chunk_rows):
+            if self._levels is not None:
+                yield self._levels[start:start + chunk_rows]
+            else:
+                yield self._profiles[self._profile_ids[start:start + chunk_rows]]
+
+    def row_levels(self, row):
+        """Option indexes of one supplier."""
+        if self._levels is not None:
+            return self._levels[row]
+        return self._profiles[self._profile_ids[row]]
+
+    @property
+    def version(self):
+        """Content hash of the catalogue, used to key caches of derived data."""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update("\0".join(self.names).encode())
+            for chunk in self.level_chunks():
+                digest.update(np.ascontiguousarray(chunk).tobytes())
+            for field in sorted(self.metadata_values):
+                digest.update(field.encode())
+                digest.update("\0".join(self.metadata_values[field]).encode())
+                digest.update(self.metadata_codes[field].tobytes())
+            self._version = digest.hexdigest()
+        return self._version
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a store from a nested `suppliers_data`-style dict.
+
+        Profiles are validated against the criteria tables, so a bad key or option string
+        fails here at load time rather than in the middle of a page render. Identical
+        profiles are stored once.
+        """
+        count = len(records)
+        names = []
+        profile_rows = {}   # encoded profile bytes -> profile id
+        profiles = []
+        profile_ids = np.zeros(count, dtype=np.uint32)
+        value_codes = {}
+        codes = {}
+
+        for row, (name, data) in enumerate(records.items()):
+            names.append(sys.intern(name))
+
+            for field, value in data.get("metadata", {}).items():
+                if field not in value_codes:
+                    value_codes[field] = {}
+                    codes[field] = [-1] * count
+                field_codes = value_codes[field]
+                if value not in field_codes:
+                    field_codes[sys.intern(value)] = len(field_codes)
+                codes[field][row] = field_codes[value]
+
+            profile = data.get("profile", {})
+            validate_profile(profile, name)
+            encoded = encode_profile(profile, name)
+            profile_id = profile_rows.setdefault(encoded.tobytes(), len(profiles))
+            if profile_id == len(profiles):
+                profiles.append(encoded)
+            profile_ids[row] = profile_id
+
+        metadata_values = {field: list(field_codes) for field, field_codes in value_codes.items()}
+        metadata_codes = {field: np.array(column, dtype=_code_dtype(len(value_codes[field])))
+                          for field, column in codes.items()}
+        profiles = np.array(profiles, dtype=np.uint8).reshape(-1, len(criteria_table))
+        return cls(names, profiles, metadata_values, metadata_codes, profile_ids=profile_ids)
+
+    # Row-level accessors
+
+    def row(self, name):
+        return self.name_index[name]
+
+    def has_metadata(self, row):
+        return any(column[row] >= 0 for column in self.metadata_codes.values())
+
+    def metadata(self, row):
+        return {field: self.metadata_values[field][column[row]]
+                for field, column in self.metadata_codes.items() if column[row] >= 0}
+
+    def profile(self, row):
+        return {crit.key: crit.options[idx] for crit, idx in zip(criteria_table, self.row_levels(row).tolist())}
+
+    # Mapping interface
+
+    def __getitem__(self, name):
+        return SupplierView(self, self.name_index[name])
+
+    def __contains__(self, name):
+        return name in self.name_index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"SupplierStore({len(self.names)} suppliers)"
@@ -368,34 +368,34 @@ suppliers_data = {
     "Salesforce": {
         "metadata": {"sector": "Enterprise Software", "geography": "USA", "size": "Large"},
         "profile": {
-            "1 Supplier General Characteristics_Supplier criticality": "Important service",
-            "1 Supplier General Characteristics_Supplier size": "Multinational",
-            "1 Supplier General Characteristics_Years of activity": ">10 years",
-            "1 Supplier General Characteristics_Dependency level": "Multiple suppliers",
-            "2 Geographical Risk Criteria_Country risk": "Stable country",
-            "2 Geographical Risk Criteria_Data hosting location": "Regulated region",
-            "2 Geographical Risk Criteria_Regulatory alignment": "GDPR / strong laws",
-            "2 Geographical Risk Criteria_Cross-border data flow": "Fully regulated",
-            "3 Sector & Activity Criteria_Sector sensitivity": "IT services",
-            "3 Sector & Activity Criteria_Service type": "Core operations",
-            "3 Sector & Activity Criteria_System access": "High access",
-            "3 Sector & Activity Criteria_Process outsourcing": "Partial",
-            "4 Information Security & Cyber Risk_Data sensitivity": "Highly confidential",
-            "4 Information Security & Cyber Risk_Security certification": "ISO 27001 / SOC2",
-            "4 Information Security & Cyber Risk_Incident history": "Minor incidents",
-            "4 Information Security & Cyber Risk_Access management": "Strong IAM",
-            "5 Business Continuity & Operational Risk_BCP / DRP": "Tested & audited",
-            "5 Business Continuity & Operational Risk_RTO / RPO": "Optimized",
-            "5 Business Continuity & Operational Risk_SLA availability": "Strong SLA",
-            "5 Business Continuity & Operational Risk_Subcontracting": "Controlled",
-            "6 Financial & Legal Risk_Financial stability": "Strong growth",
-            "6 Financial & Legal Risk_Legal compliance": "Fully compliant",
-            "6 Financial & Legal Risk_Insurance": "Full coverage",
-            "6 Financial & Legal Risk_Litigation history": "Rare",
-            "7 ESG & Ethical Criteria_Ethics policy": "Enforced",
-            "7 ESG & Ethical Criteria_Anti-corruption": "Audited program",
-            "7 ESG & Ethical Criteria_Environmental impact": "Sustainable",
-            "7 ESG & Ethical Criteria_Social responsibility": "Certified / audited"
+            "1️⃣ Supplier General Characteristics_Supplier criticality": "Important service",
+            "1️⃣ Supplier General Characteristics_Supplier size": "Multinational",
+            "1️⃣ Supplier General Characteristics_Years of activity": ">10 years",
+            "1️⃣ Supplier General Characteristics_Dependency level": "Multiple suppliers",
+            "2️⃣ Geographical Risk Criteria_Country risk": "Stable country",
+            "2️⃣ Geographical Risk Criteria_Data hosting location": "Regulated region",
+            "2️⃣ Geographical Risk Criteria_Regulatory alignment": "GDPR / strong laws",
+            "2️⃣ Geographical Risk Criteria_Cross-border data flow": "Fully regulated",
+            "3️⃣ Sector & Activity Criteria_Sector sensitivity": "IT services",
+            "3️⃣ Sector & Activity Criteria_Service type": "Core operations",
+            "3️⃣ Sector & Activity Criteria_System access": "High access",
+            "3️⃣ Sector & Activity Criteria_Process outsourcing": "Partial",
+            "4️⃣ Information Security & Cyber Risk_Data sensitivity": "Highly confidential",
+            "4️⃣ Information Security & Cyber Risk_Security certification": "ISO 27001 / SOC2",
+            "4️⃣ Information Security & Cyber Risk_Incident history": "Minor incidents",
+            "4️⃣ Information Security & Cyber Risk_Access management": "Strong IAM",
+            "5️⃣ Business Continuity & Operational Risk_BCP / DRP": "Tested & audited",
+            "5️⃣ Business Continuity & Operational Risk_RTO / RPO": "Optimized",
+            "5️⃣ Business Continuity & Operational Risk_SLA availability": "Strong SLA",
+            "5️⃣ Business Continuity & Operational Risk_Subcontracting": "Controlled",
+            "6️⃣ Financial & Legal Risk_Financial stability": "Strong growth",
+            "6️⃣ Financial & Legal Risk_Legal compliance": "Fully compliant",
+            "6️⃣ Financial & Legal Risk_Insurance": "Full coverage",
+            "6️⃣ Financial & Legal Risk_Litigation history": "Rare",
+            "7️⃣ ESG & Ethical Criteria_Ethics policy": "Enforced",
+            "7️⃣ ESG & Ethical Criteria_Anti-corruption": "Audited program",
+            "7️⃣ ESG & Ethical Criteria_Environmental impact": "Sustainable",
+            "7️⃣ ESG & Ethical Criteria_Social responsibility": "Certified / audited"
         }
     },
     "Apple": {
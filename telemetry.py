@@ -0,0 +1,174 @@
+# telemetry.py
+# Timed spans around the stages of a page rerun, collected per session and per process
+#
+# Enabled with TPRM_TELEMETRY=1 (or TPRM_TELEMETRY=panel to also show a debug panel in the
+# sidebar). When disabled, span() hands back one shared no-op context manager, so an
+# instrumented block costs a function call and an empty with statement.
+#
+# Each span keeps a window of its most recent durations, from which p50/p95/p99 are
+# computed. With TPRM_TELEMETRY_DUMP=path the process-wide aggregates are written to that
+# file after a rerun (at most every TELEMETRY_DUMP_INTERVAL seconds) and at exit: Prometheus
+# text format, or JSON when the path ends in .json.
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+TELEMETRY_MODE = os.environ.get("TPRM_TELEMETRY", "").lower()
+TELEMETRY_ENABLED = TELEMETRY_MODE not in ("", "0", "off", "false")
+TELEMETRY_PANEL = TELEMETRY_MODE == "panel"
+TELEMETRY_DUMP = os.environ.get("TPRM_TELEMETRY_DUMP")
+TELEMETRY_DUMP_INTERVAL = 10.0
+# Recent durations kept per span for the percentiles
+SAMPLE_WINDOW = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_NOOP = nullcontext()
+
+
+class Timings:
+    """Durations of named spans: totals plus a window of recent samples."""
+
+    def __init__(self, window=SAMPLE_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.count = {}
+        self.total = {}
+
+    def add(self, name, seconds):
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+            self.count[name] = 0
+            self.total[name] = 0.0
+        self.samples[name].append(seconds)
+        self.count[name] += 1
+        self.total[name] += seconds
+
+    def summary(self):
+        """{span: {"count", "total_ms", "p50_ms", "p95_ms", "p99_ms"}} in milliseconds."""
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats = {"count": self.count[name], "total_ms": round(self.total[name] * 1000, 3)}
+            for q in QUANTILES:
+                # Nearest-rank percentile over the sample window
+                stats[f"p{round(q * 100)}_ms"] = round(ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000, 3)
+            result[name] = stats
+        return result
+
+
+_process = Timings()
+_process_lock = threading.Lock()
+_last_dump = 0.0
+
+
+def _session_timings():
+    import streamlit as st
+
+    try:
+        return st.session_state.setdefault("_telemetry", Timings())
+    except Exception:
+        # No script run context (e.g. imported outside `streamlit run`): process totals only
+        return None
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """Context manager timing one stage of a rerun under `name`."""
+    if not TELEMETRY_ENABLED:
+        return _NOOP
+    return _Span(name)
+
+
+def record(name, seconds):
+    """Add one duration to the session's and the process's timings."""
+    session = _session_timings()
+    if session is not None:
+        session.add(name, seconds)
+    with _process_lock:
+        _process.add(name, seconds)
+
+
+def process_summary():
+    with _process_lock:
+        return _process.summary()
+
+
+def session_summary():
+    session = _session_timings()
+    return session.summary() if session is not None else {}
+
+
+def prometheus_text(summary):
+    lines = ["# HELP tprm_span_seconds Duration of instrumented app stages",
+             "# TYPE tprm_span_seconds summary"]
+    for name, stats in sorted(summary.items()):
+        for q in QUANTILES:
+            value = stats[f"p{round(q * 100)}_ms"] / 1000
+            lines.append(f'tprm_span_seconds{{span="{name}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'tprm_span_seconds_sum{{span="{name}"}} {stats["total_ms"] / 1000:.6f}')
+        lines.append(f'tprm_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    """Write the process-wide aggregates to `path` (JSON for .json, else Prometheus text)."""
+    summary = process_summary()
+    if path.endswith(".json"):
+        text = json.dumps({"pid": os.getpid(), "timestamp": time.time(), "spans": summary}, indent=2) + "\n"
+    else:
+        text = prometheus_text(summary)
+    # Written to a temporary file and swapped in, so a scraper never reads a partial dump
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def end_rerun():
+    """Called once at the end of every rerun: writes the dump file when one is configured."""
+    global _last_dump
+    if not TELEMETRY_ENABLED or not TELEMETRY_DUMP:
+        return
+    now = time.monotonic()
+    if now - _last_dump >= TELEMETRY_DUMP_INTERVAL:
+        _last_dump = now
+        dump(TELEMETRY_DUMP)
+
+
+if TELEMETRY_ENABLED and TELEMETRY_DUMP:
+    # Final aggregates on shutdown, whatever the time since the last rerun dump
+    atexit.register(lambda: dump(TELEMETRY_DUMP))
+
+
+def render_debug_panel():
+    """Sidebar table of this session's and this process's span percentiles."""
+    if not TELEMETRY_PANEL:
+        return
+    import streamlit as st
+
+    with st.sidebar.expander("Telemetry"):
+        for title, summary in (("This session", session_summary()), ("This process", process_summary())):
+            st.markdown(f"**{title}**")
+            st.table([{"span": name, **stats} for name, stats in summary.items()])
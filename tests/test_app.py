@@ -0,0 +1,43 @@
+# test_app.py
+# The Risk Assessment page run headless with Streamlit's AppTest
+
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import supplier_cache
+from criteria import COUNTRY_RISK
+from screening import SANCTIONED_OPTION
+from suppliers_data import suppliers_data
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    watch_list = tmp_path / "watch_list.csv"
+    watch_list.write_text("id,name,aliases\nW1,Google LLC,\n", encoding="utf-8")
+    monkeypatch.setattr(supplier_cache, "WATCH_LIST_PATH", str(watch_list))
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def select_supplier(app, name):
+    next(box for box in app.selectbox if box.label == "Select Supplier from Database").set_value(name).run()
+
+
+def test_watch_list_hit_prefills_country_risk_after_the_first_supplier(app):
+    first = next(box for box in app.selectbox if box.label == "Select Supplier from Database").value
+    assert first != "Google"
+    assert app.selectbox(key=COUNTRY_RISK.key).value == suppliers_data[first]["profile"][COUNTRY_RISK.key]
+
+    select_supplier(app, "Google")
+    assert any("Possible watch-list match" in error.value for error in app.error)
+    assert app.selectbox(key=COUNTRY_RISK.key).value == SANCTIONED_OPTION
+
+
+def test_switching_supplier_prefills_its_profile(app):
+    select_supplier(app, "Google")
+    select_supplier(app, "Oracle")
+    profile = suppliers_data["Oracle"]["profile"]
+    assert {key: app.selectbox(key=key).value for key in profile} == profile
@@ -0,0 +1,16 @@
+# test_scoring_models.py
+# The default and an equivalent explicitly weighted model against the original overall rule
+
+from model_regression import EXPLICIT_MODEL, mismatches
+from scoring import default_model
+from synthetic import generate_store
+
+
+def test_explicit_model_takes_the_weighted_path():
+    assert default_model.is_unweighted_mean
+    assert not EXPLICIT_MODEL.is_unweighted_mean
+
+
+def test_scoring_paths_reproduce_the_original_rule():
+    store = generate_store(2000, seed=7)
+    assert list(mismatches(store))[:5] == []